@@ -1,25 +1,123 @@
 # aggregator.py
 
+import io
 import os
 import gzip
 import json
 import logging
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
-from checksums import load_checksum_cache, save_checksum_cache, compute_md5
-from file_scanner import should_ignore_file, collect_file_candidates
+from checksums import load_checksum_cache, save_checksum_cache, compute_digest_bytes, make_cache_entry
+from file_scanner import collect_file_candidates
 from js_parser import gather_js_ts_summary
 from config import DEFAULT_CONFIG
 
+# Write buffer for the output file; lets deflate see MB-sized inputs
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Reads submitted but not yet written, per thread; keeps the file contents
+# held in memory bounded on huge trees
+MAX_INFLIGHT_PER_THREAD = 4
+
+def read_file_bytes(file_path: str) -> tuple:
+    """
+    Reads a whole file with one os.open and as few os.read calls as possible,
+    bypassing the buffered/text IO layers. Returns (data, stat_result).
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        st = os.fstat(fd)
+        chunks = []
+        remaining = st.st_size
+        while True:
+            # Read the expected size in one go; keep going in case the file grew
+            chunk = os.read(fd, max(remaining, 1 << 16))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+    finally:
+        os.close(fd)
+    data = chunks[0] if len(chunks) == 1 else b''.join(chunks)
+    return data, st
+
 def read_file_content(file_path: str, config: dict, checksum_cache: dict) -> tuple:
+    """
+    Returns (file_path, data, digest) with the raw file bytes; they are written to
+    the output as-is, with no decode/encode round trip. The digest is None unless
+    checksum caching or output deduplication needs it (empty files are never
+    deduplicated, so they are only hashed for the checksum cache).
+    """
+    # One open serves both the checksum and the content
+    data, st = read_file_bytes(file_path)
+    file_digest = None
+    if config['use_checksum_cache'] or (config['dedupe_output'] and data):
+        file_digest = compute_digest_bytes(data)
     if config['use_checksum_cache']:
-        file_md5 = compute_md5(file_path)
-        checksum_cache[file_path] = file_md5
+        checksum_cache[file_path] = make_cache_entry(st, file_digest)
+
+    return file_path, data, file_digest
+
+def open_output(path: str, compress: bool):
+    """
+    Opens the context output as a binary stream backed by a 1 MiB write buffer.
+    With compress, the buffer sits in front of a GzipFile (mtime=0 so
+    identical inputs produce identical archives).
+    """
+    if compress:
+        raw = gzip.GzipFile(path, 'wb', compresslevel=6, mtime=0)
+        return io.BufferedWriter(raw, buffer_size=OUTPUT_BUFFER_SIZE)
+    return open(path, 'wb', buffering=OUTPUT_BUFFER_SIZE)
+
+def iter_completed_reads(executor, file_paths, config: dict, checksum_cache: dict):
+    """
+    Reads file_paths on the executor and yields (path, data, digest) for each
+    read as it completes, logging and skipping files that failed to read.
+    At most MAX_INFLIGHT_PER_THREAD reads per thread are submitted ahead of
+    the consumer; the next path is only pulled once a slot frees up.
+    """
+    max_inflight = MAX_INFLIGHT_PER_THREAD * config['threads']
+    future_map = {}
+
+    def results(futures):
+        for fut in futures:
+            original_fp = future_map.pop(fut)
+            try:
+                yield fut.result()
+            except Exception as e:
+                logging.warning(f"Error reading {original_fp}: {e}")
 
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-    return file_path, content
+    count = 0
+    for fpath in file_paths:
+        if len(future_map) >= max_inflight:
+            done, _ = wait(future_map, return_when=FIRST_COMPLETED)
+            yield from results(done)
+        future_map[executor.submit(read_file_content, fpath, config, checksum_cache)] = fpath
+        count += 1
+    logging.info(f"{count} files remain after filtering.")
+    yield from results(as_completed(future_map))
+
+def iter_output_chunks(results):
+    """
+    Flattens (path, data, digest) results into the output layout (as bytes):
+    path line, then content. A file whose digest was already written is emitted as a
+    "# DUPLICATE OF <first path>" line instead of repeating its content.
+    Empty files all share a digest without being copies of each other, so
+    they are always written as they are.
+    """
+    seen = {}
+    for fp, data, file_digest in results:
+        yield os.fsencode(fp)
+        yield b'\n'
+        if file_digest is not None and data:
+            first_fp = seen.setdefault(file_digest, fp)
+            if first_fp != fp:
+                logging.debug(f"{fp} duplicates {first_fp}")
+                yield b'# DUPLICATE OF ' + os.fsencode(first_fp) + b'\n'
+                continue
+        yield data
+        yield b'\n'
 
 def collect_and_write_context(config: dict):
     # Step 1: Potentially rename the output file if project_name is set
@@ -42,64 +140,42 @@ def collect_and_write_context(config: dict):
     else:
         checksum_cache = {}
 
-    # 4) Gather file candidates
-    file_candidates = collect_file_candidates(config)
-    logging.info(f"Collected {len(file_candidates)} candidate files.")
-
-    # 5) Filter them
-    logging.info("Filtering files...")
-    filtered_files = []
-    for fpath in file_candidates:
-        if not should_ignore_file(fpath, config, checksum_cache):
-            filtered_files.append(fpath)
-    logging.info(f"{len(filtered_files)} files remain after filtering.")
-
-    # 6) Read them in parallel
-    logging.info("Reading file contents...")
-    results = []
-    with ThreadPoolExecutor(max_workers=config['threads']) as executor:
-        future_map = {
-            executor.submit(read_file_content, fpath, config, checksum_cache): fpath
-            for fpath in filtered_files
-        }
-        for fut in as_completed(future_map):
-            original_fp = future_map[fut]
-            try:
-                results.append(fut.result())
-            except Exception as e:
-                logging.warning(f"Error reading {original_fp}: {e}")
-
-    # 7) Build final output path
+    # 4) Build final output path
     final_output_path = os.path.join(output_folder, config['output_filename'])
 
     # If compress, .gz appended
     if config['compress_output']:
         final_output_path += '.gz'
-        open_fn = gzip.open
-        open_mode = 'wt'
         logging.info(f"Output will be compressed at: {final_output_path}")
     else:
-        open_fn = open
-        open_mode = 'w'
         logging.info(f"Output file: {final_output_path}")
 
-    # 8) Write to output
-    with open_fn(final_output_path, open_mode, encoding='utf-8') as outfile:
-        for (fp, content) in results:
-            outfile.write(fp + '\n')
-            outfile.write(content + '\n')
-
-    # 9) Save checksums
+    # 5) Filter candidates during the walk and read them in parallel, streaming
+    #    each file to the output as it completes; the number of reads in flight
+    #    is capped, so only their contents are held in memory
+    logging.info("Collecting and reading files...")
+    with open_output(final_output_path, config['compress_output']) as outfile, \
+            ThreadPoolExecutor(max_workers=config['threads']) as executor:
+        results = iter_completed_reads(executor, collect_file_candidates(config, checksum_cache),
+                                       config, checksum_cache)
+        # writelines lets the 1 MiB buffer coalesce the small writes
+        outfile.writelines(iter_output_chunks(results))
+
+    # 6) Save checksums
     if config['use_checksum_cache']:
         save_checksum_cache(config['checksum_cache'], checksum_cache)
 
-    # 10) Gather JS summary if requested
+    # 7) Gather JS summary if requested
     if config['gather_js_summary']:
         js_summary_path = os.path.join(output_folder, config['gather_js_summary'])
         logging.info(f"Gathering JS/TS summary into {js_summary_path}...")
 
         project_path = config.get('project_path', '.') or '.'
-        summary_list = gather_js_ts_summary(Path(project_path))
+        summary_list = gather_js_ts_summary(
+            Path(project_path),
+            max_workers=config['threads'],
+            ignore_dirs=config['_ignore_dirs'],
+        )
 
         with open(js_summary_path, 'w', encoding='utf-8') as f:
             json.dump(summary_list, f, indent=2)
@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
 import os
 import json
+import asyncio
+import hashlib
 import argparse
+import functools
 from pathlib import Path
 
 import openai
 import tiktoken  # for accurate token counting
 
+try:
+    import orjson  # optional: much faster JSON encoding for large result sets
+except ImportError:
+    orjson = None
+
 def get_args():
     parser = argparse.ArgumentParser(description="Send files to ChatGPT for analysis based on a pre-prompt.")
     parser.add_argument(
@@ -40,6 +48,12 @@ def get_args():
         default=[".js", ".ts", ".jsx", ".tsx", ".html", ".css", ".wasm", ".py"],
         help="List of file extensions to include."
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Maximum number of OpenAI requests in flight at once."
+    )
     return parser.parse_args()
 
 
@@ -55,16 +69,24 @@ def read_file_content(file_path):
         return None
 
 
-def get_token_count_for_message(model_name, prompt_content):
+@functools.lru_cache(maxsize=None)
+def get_encoding(model_name):
+    """
+    Load the tiktoken encoding for a model once; resolving it is expensive.
+    """
+    return tiktoken.encoding_for_model(model_name)
+
+
+def get_token_count_for_messages(model_name, prompt_contents):
     """
-    Get approximate token count for a single message using tiktoken.
+    Get approximate total token count for a list of messages using tiktoken.
     The tokens used in a chat completion also include system, user, assistant roles, etc.
     But for a rough estimate, let's just measure the content + prompt overhead.
+    Messages are encoded in parallel by tiktoken's native batch encoder.
     """
-    # Example encoding to handle standard ChatGPT models
-    encoding = tiktoken.encoding_for_model(model_name)
-    tokens = encoding.encode(prompt_content)
-    return len(tokens)
+    encoding = get_encoding(model_name)
+    token_lists = encoding.encode_batch(prompt_contents, num_threads=os.cpu_count() or 1)
+    return sum(map(len, token_lists))
 
 
 def estimate_costs_for_models(total_tokens):
@@ -96,9 +118,14 @@ def estimate_costs_for_models(total_tokens):
     return estimates
 
 
-def analyze_file_with_chatgpt(file_path, file_content, prompt, model):
+MAX_RETRIES = 5  # attempts per file when rate limited
+
+
+async def analyze_file_with_chatgpt(client, semaphore, file_path, file_content, prompt, model):
     """
     Send the file content plus your pre-prompt to the ChatGPT API and get the response.
+    The semaphore bounds how many requests are in flight; rate-limited calls
+    are retried with exponential backoff.
     """
     # Construct conversation with system + user
     messages = [
@@ -114,16 +141,37 @@ def analyze_file_with_chatgpt(file_path, file_content, prompt, model):
         }
     ]
 
-    try:
-        response = openai.ChatCompletion.create(
-            model=model,
-            messages=messages,
-            temperature=0.2,
-        )
-        return response["choices"][0]["message"]["content"]
-    except Exception as e:
-        print(f"Error calling OpenAI API for file {file_path}: {e}")
-        return None
+    async with semaphore:
+        for attempt in range(MAX_RETRIES):
+            try:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.2,
+                )
+                return response.choices[0].message.content
+            except openai.RateLimitError:
+                delay = 2 ** attempt
+                print(f"Rate limited on {file_path}, retrying in {delay}s...")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                print(f"Error calling OpenAI API for file {file_path}: {e}")
+                return None
+    print(f"Giving up on {file_path} after {MAX_RETRIES} rate-limited attempts.")
+    return None
+
+
+async def analyze_all_files(file_contents, prompt, model, api_key, concurrency):
+    """
+    Run analyze_file_with_chatgpt for every file concurrently.
+    Responses are returned in the same order as file_contents.
+    """
+    client = openai.AsyncOpenAI(api_key=api_key)
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(
+        analyze_file_with_chatgpt(client, semaphore, file_path, content, prompt, model)
+        for file_path, content in file_contents
+    ))
 
 
 def main():
@@ -131,11 +179,11 @@ def main():
 
     # Setup API Key
     if args.api_key:
-        openai.api_key = args.api_key
+        api_key = args.api_key
     else:
         if "OPENAI_API_KEY" not in os.environ:
             raise ValueError("No OpenAI API key provided. Either set --api_key or set OPENAI_API_KEY in your environment.")
-        openai.api_key = os.environ["OPENAI_API_KEY"]
+        api_key = os.environ["OPENAI_API_KEY"]
 
     project_dir = Path(args.project_dir).resolve()
     output_path = Path(args.output).resolve()
@@ -151,21 +199,37 @@ def main():
                 if content is not None:
                     file_contents.append((file_path, content))
 
+    # Identical files (e.g. copies across subpackages) are only sent once;
+    # duplicates reuse the first copy's response.
+    unique_contents = []
+    first_index_by_hash = {}
+    source_index = []
+    for file_path, content in file_contents:
+        # Empty files all hash alike without being copies, so they aren't indexed
+        digest = hashlib.md5(content.encode("utf-8")).hexdigest() if content else None
+        index = first_index_by_hash.get(digest)
+        if index is None:
+            index = len(unique_contents)
+            unique_contents.append((file_path, content))
+            if digest is not None:
+                first_index_by_hash[digest] = index
+        source_index.append(index)
+    if len(unique_contents) < len(file_contents):
+        print(f"Skipping {len(file_contents) - len(unique_contents)} duplicate file(s).")
+
     # 2) Count total tokens (rough estimate) for all files with the prompt
     # Let's do a single combined prompt approach for cost estimates: 
     #  We'll approximate that each file is processed separately with a user message 
     #  that includes both the question and the file content. 
     # This is a rough approach, actual usage might differ if you chunk content.
-    total_tokens = 0
-    for file_path, content in file_contents:
-        user_message = f"{args.prompt}\n\n---\nFile content:\n{content}"
-        # We'll add overhead for system message. Let's just do a minimal approach:
-        system_message = ("You are a helpful assistant that analyzes source code files.")
-        # combined content for counting
-        combined_content = system_message + "\n\n" + user_message
-        # Count tokens for the default model (or pick a standard reference like "gpt-3.5-turbo")
-        tokens_for_this_file = get_token_count_for_message("gpt-3.5-turbo", combined_content)
-        total_tokens += tokens_for_this_file
+    # We'll add overhead for system message. Let's just do a minimal approach:
+    system_message = ("You are a helpful assistant that analyzes source code files.")
+    combined_contents = [
+        system_message + "\n\n" + f"{args.prompt}\n\n---\nFile content:\n{content}"
+        for _, content in unique_contents
+    ]
+    # Count tokens for the default model (or pick a standard reference like "gpt-3.5-turbo")
+    total_tokens = get_token_count_for_messages("gpt-3.5-turbo", combined_contents)
 
     # 3) Estimate cost for 3 known models
     estimates = estimate_costs_for_models(total_tokens)
@@ -181,29 +245,38 @@ def main():
         print("Aborted by user.")
         return
 
-    # 5) If confirmed, proceed with actual calls
+    # 5) If confirmed, proceed with actual calls (concurrently)
+    unique_responses = asyncio.run(analyze_all_files(
+        unique_contents,
+        prompt=args.prompt,
+        model=args.model,
+        api_key=api_key,
+        concurrency=args.concurrency,
+    ))
+
     all_responses = []
-    for file_path, content in file_contents:
-        response = analyze_file_with_chatgpt(
-            file_path=file_path,
-            file_content=content,
-            prompt=args.prompt,
-            model=args.model,
-        )
+    for (file_path, content), index in zip(file_contents, source_index):
+        response = unique_responses[index]
         if response:
             result = {
                 "file_path": str(file_path.relative_to(project_dir)),
                 "prompt": args.prompt,
                 "response": response,
             }
+            first_path = unique_contents[index][0]
+            if first_path != file_path:
+                result["duplicate_of"] = str(first_path.relative_to(project_dir))
             all_responses.append(result)
             print(f"[OK] Processed {file_path}")
         else:
             print(f"[SKIP] {file_path} due to API error.")
 
     # 6) Save all responses to JSON
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(all_responses, f, indent=4, ensure_ascii=False)
+    if orjson is not None:
+        output_path.write_bytes(orjson.dumps(all_responses, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            json.dump(all_responses, f, indent=4, ensure_ascii=False)
 
     print(f"\nAnalysis complete. Results saved to {output_path}.")
 
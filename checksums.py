@@ -1,11 +1,30 @@
 import os
 import json
+import mmap
 import hashlib
 import logging
 
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import blake3
+except ImportError:  # optional speedup
+    blake3 = None
+
+# Fingerprints only answer "has this file changed?", so a fast SIMD hash is
+# preferred when installed. The name is stored with each cache entry so
+# switching algorithms invalidates old entries instead of mismatching them.
+HASH_ALGO = 'blake3' if blake3 is not None else 'blake2b'
+
+# Chunk size for the last-resort read loop (used only when mmap is unavailable)
+FALLBACK_CHUNK_SIZE = 1024 * 1024
+
 def load_checksum_cache(cache_path: str) -> dict:
     """
-    Loads a JSON dictionary of file->md5 checksums.
+    Loads a JSON dictionary of file->{"size", "mtime_ns", "algo", "digest"} entries.
     Returns {} if file not found or error.
     """
     if not os.path.exists(cache_path):
@@ -21,20 +40,81 @@ def load_checksum_cache(cache_path: str) -> dict:
 def save_checksum_cache(cache_path: str, cache_dict: dict):
     """
     Saves the dictionary of checksums to a JSON file.
+    The cache is machine-read only, so it is written compactly in one write
+    (via orjson when installed).
     """
     try:
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(cache_dict, f, indent=2)
+        if orjson is not None:
+            data = orjson.dumps(cache_dict)
+        else:
+            data = json.dumps(cache_dict, separators=(',', ':')).encode('utf-8')
+        with open(cache_path, 'wb') as f:
+            f.write(data)
     except Exception as e:
         logging.warning(f"Could not save checksum cache {cache_path}: {e}")
 
 
-def compute_md5(file_path: str) -> str:
+def compute_digest(file_path: str) -> str:
     """
-    Computes the MD5 checksum of a file.
+    Computes the HASH_ALGO fingerprint of a file.
+    BLAKE3 hashes a memory map of the file with SIMD. BLAKE2b uses
+    hashlib.file_digest (Python 3.11+), which loops in C and releases the GIL;
+    older interpreters hash an mmap in a single update() call, falling back
+    to 1 MiB reads if mmap fails.
     """
-    md5_hash = hashlib.md5()
+    if blake3 is not None:
+        return blake3.blake3().update_mmap(file_path).hexdigest()
+
     with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
-            md5_hash.update(chunk)
-    return md5_hash.hexdigest()
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'blake2b').hexdigest()
+
+        blake2_hash = hashlib.blake2b()
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                blake2_hash.update(mm)
+        except (ValueError, OSError):
+            # Empty files and special filesystems cannot be mapped
+            f.seek(0)
+            for chunk in iter(lambda: f.read(FALLBACK_CHUNK_SIZE), b''):
+                blake2_hash.update(chunk)
+        return blake2_hash.hexdigest()
+
+
+def compute_digest_bytes(data: bytes) -> str:
+    """
+    Computes the HASH_ALGO fingerprint of an in-memory buffer (for files already read).
+    """
+    if blake3 is not None:
+        return blake3.blake3(data).hexdigest()
+    return hashlib.blake2b(data).hexdigest()
+
+
+def make_cache_entry(st: os.stat_result, digest: str) -> dict:
+    """
+    Builds a checksum cache entry from a stat result and its fingerprint.
+    """
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "algo": HASH_ALGO, "digest": digest}
+
+
+def cached_digest(entry):
+    """
+    Returns the fingerprint stored in a cache entry, or None if the entry is
+    missing, in an old format, or was made with a different algorithm.
+    """
+    if isinstance(entry, dict) and entry.get("algo") == HASH_ALGO:
+        return entry.get("digest")
+    return None
+
+
+def is_entry_fresh(entry, st: os.stat_result) -> bool:
+    """
+    Returns True if the cached entry still matches the file's size and mtime,
+    meaning the file can be treated as unchanged without hashing it.
+    Entries from older formats or another algorithm never match.
+    """
+    return (
+        cached_digest(entry) is not None
+        and entry.get("size") == st.st_size
+        and entry.get("mtime_ns") == st.st_mtime_ns
+    )
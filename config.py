@@ -2,6 +2,8 @@
 import json
 import logging
 import os
+import re
+from datetime import datetime
 
 DEFAULT_CONFIG = {
     # File scanning
@@ -48,9 +50,11 @@ DEFAULT_CONFIG = {
     # Output / Behavior
     'output_filename': 'context.txt',
     'compress_output': False,
-    'checksum_cache': '.file_checksums.json',
+    'checksum_cache': '.file_fingerprints.json',
     'use_checksum_cache': False,
     'gather_js_summary': None,
+    # Write identical files once; later copies become a reference line
+    'dedupe_output': True,
 
     # Optional scanning overrides
     'explicit_files': [],
@@ -93,3 +97,23 @@ def merge_configs(base_config: dict, override_config: dict) -> dict:
         else:
             merged[key] = value
     return merged
+
+
+def normalize_config(config: dict) -> dict:
+    """
+    Precomputes the lookup structures used on the scanning hot path.
+    Call once after all overrides are merged; derived keys are prefixed with '_'.
+    """
+    patterns = config['ignore_patterns']
+    # An empty alternation would match everything, so keep None when unset
+    config['_ignore_regex'] = (
+        re.compile('|'.join(f'(?:{p})' for p in patterns)) if patterns else None
+    )
+    config['_ignore_exts'] = tuple(config['ignore_extensions'])
+    config['_file_exts'] = tuple(config['file_extensions'])
+    config['_ignore_dirs'] = frozenset(config['ignore_directories'])
+    # Memo of directory name -> skip verdict, filled in by should_skip_directory
+    config['_skip_dir_cache'] = {}
+    # Parse the date cutoff once; the scanner compares raw st_mtime floats
+    config['_modified_after_ts'] = datetime.strptime(config['modified_after'], '%Y-%m-%d').timestamp()
+    return config
@@ -1,71 +1,116 @@
 # file_scanner.py
 import os
-import re
 import logging
-from datetime import datetime
 from pathlib import Path
 
-from checksums import compute_md5
+from checksums import compute_digest, make_cache_entry, cached_digest, is_entry_fresh
 
 def should_skip_directory(dirname: str, config: dict) -> bool:
     # Check exact match first
-    if dirname in config['ignore_directories']:
+    if dirname in config['_ignore_dirs']:
         return True
-    # Also check patterns
-    for pat in config['ignore_patterns']:
-        if re.search(pat, dirname):
-            return True
-    return False
+    # Also check patterns; directory names repeat a lot across a tree
+    # (src, lib, test...), so each name's verdict is computed once
+    skip_cache = config['_skip_dir_cache']
+    skip = skip_cache.get(dirname)
+    if skip is None:
+        ignore_regex = config['_ignore_regex']
+        skip = ignore_regex is not None and ignore_regex.search(dirname) is not None
+        skip_cache[dirname] = skip
+    return skip
 
-def should_ignore_file(file_path: str, config: dict, checksum_cache: dict) -> bool:
+def should_ignore_file(file_path: str, config: dict, checksum_cache: dict,
+                       st: os.stat_result = None) -> bool:
     """
     Returns True if the file should be ignored based on config rules:
       - Ignored extensions
       - File size limit
       - Modified date
       - Regex ignore patterns
-      - MD5 checksums if enabled
+      - Content fingerprints if enabled (size + mtime first, hashing only on mismatch)
+
+    Pass `st` when the stat result is already known (e.g. from os.scandir)
+    to avoid another stat syscall.
     """
     # Extension check
-    if any(file_path.endswith(ext) for ext in config['ignore_extensions']):
+    if file_path.endswith(config['_ignore_exts']):
         return True
 
+    # One stat serves the size, date and checksum checks
+    if st is None:
+        st = os.stat(file_path)
+
     # File size
-    if os.path.getsize(file_path) > config['max_file_size']:
+    if st.st_size > config['max_file_size']:
         return True
 
     # Modification date
-    file_mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-    if file_mod_time < datetime.strptime(config['modified_after'], '%Y-%m-%d'):
+    if st.st_mtime < config['_modified_after_ts']:
         return True
 
     # Regex ignore patterns
-    for pattern in config['ignore_patterns']:
-        if re.search(pattern, file_path):
-            return True
+    ignore_regex = config['_ignore_regex']
+    if ignore_regex is not None and ignore_regex.search(file_path):
+        return True
 
     # Checksum
     if config['use_checksum_cache']:
-        new_md5 = compute_md5(file_path)
-        old_md5 = checksum_cache.get(file_path)
-        if old_md5 is not None and old_md5 == new_md5:
+        entry = checksum_cache.get(file_path)
+        if is_entry_fresh(entry, st):
             logging.debug(f"Skipping unchanged file: {file_path}")
             return True
+        # Size or mtime moved: only the hash can tell if the content changed
+        old_digest = cached_digest(entry)
+        if old_digest is not None and old_digest == compute_digest(file_path):
+            checksum_cache[file_path] = make_cache_entry(st, old_digest)
+            logging.debug(f"Skipping unchanged file (touched): {file_path}")
+            return True
 
     return False
 
 
-def collect_file_candidates(config: dict) -> list:
-    file_candidates = []
+def iter_files(root: str, exts: tuple, skip_dir=None):
+    """
+    Yields os.DirEntry objects for files under root whose name ends with one of exts.
+    Walks with os.scandir and an explicit stack, so no per-directory lists are
+    built and each entry's type/stat info comes from the directory read.
+    Directories whose name satisfies skip_dir(name) are pruned; symlinked
+    directories are not followed, like os.walk.
+    """
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError as e:
+            logging.warning(f"Could not scan directory: {e}")
+            continue
+        with it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir:
+                    if entry.is_symlink() or (skip_dir is not None and skip_dir(entry.name)):
+                        continue
+                    stack.append(entry.path)
+                elif entry.name.endswith(exts):
+                    yield entry
+
+
+def collect_file_candidates(config: dict, checksum_cache: dict):
+    """
+    Walks project_path and yields paths of files matching file_extensions that
+    pass should_ignore_file. Filtering happens during the walk using the
+    DirEntry's stat, so no intermediate candidate list is built.
+    """
     base_path = config.get('project_path', '') or '.'
     base_path = os.path.abspath(base_path)
-    
-    for root, dirs, files in os.walk(base_path, topdown=True):
-        # Filter out directories based on ignore logic
-        dirs[:] = [d for d in dirs if not should_skip_directory(d, config)]
-        # Then build file candidates
-        for fname in files:
-            if any(fname.endswith(ext) for ext in config['file_extensions']):
-                full_path = os.path.join(root, fname)
-                file_candidates.append(full_path)
-    return file_candidates
+
+    skip_dir = lambda dirname: should_skip_directory(dirname, config)
+    for entry in iter_files(base_path, config['_file_exts'], skip_dir):
+        try:
+            if not should_ignore_file(entry.path, config, checksum_cache, entry.stat()):
+                yield entry.path
+        except OSError as e:
+            logging.warning(f"Could not stat {entry.path}: {e}")
@@ -1,16 +1,173 @@
-import os
 import re
+import functools
+from bisect import bisect_left
+from itertools import accumulate
 from pathlib import Path
-
-# Regex Patterns for JS/TS Analysis
-IMPORT_PATTERN = re.compile(r'^\s*import\s+(?:[\w*\s{},]+from\s+)?["\']([^"\']+)["\']', re.MULTILINE)
-REQUIRE_PATTERN = re.compile(r'\brequire\s*\(\s*["\']([^"\']+)["\']\s*\)', re.MULTILINE)
-FUNCTION_PATTERN = re.compile(r'(?:export\s+)?function\s+([\w$]+)\s*\(', re.MULTILINE)
-CLASS_PATTERN = re.compile(r'(?:export\s+)?class\s+([\w$]+)\s*\{', re.MULTILINE)
-PROTOTYPE_METHOD_PATTERN = re.compile(
-    r'([\w$]+)\.prototype\.([\w$]+)\s*=\s*function\s*\([^)]*\)',
+from concurrent.futures import ProcessPoolExecutor
+
+from file_scanner import iter_files
+
+try:
+    from tree_sitter_languages import get_parser
+except ImportError:  # optional: fall back to the regex scanner
+    get_parser = None
+
+JS_TS_EXTENSIONS = ('.js', '.jsx', '.ts', '.tsx')
+
+# tree-sitter grammar per extension
+TREE_SITTER_LANGUAGES = {
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'tsx',
+}
+FUNCTION_NODE_TYPES = ('function_declaration', 'generator_function_declaration')
+CLASS_NODE_TYPES = ('class_declaration', 'abstract_class_declaration')
+FUNCTION_VALUE_TYPES = ('function', 'function_expression')
+
+# Regex Patterns for JS/TS Analysis, fused into one alternation so each file
+# is scanned in a single pass. The named group that matched tells us the kind.
+JS_TS_PATTERN = re.compile(
+    r'^\s*import\s+(?:[\w*\s{},]+from\s+)?["\'](?P<import>[^"\']+)["\']'
+    r'|\brequire\s*\(\s*["\'](?P<require>[^"\']+)["\']\s*\)'
+    r'|(?:export\s+)?function\s+(?P<function>[\w$]+)\s*\('
+    r'|(?:export\s+)?class\s+(?P<class>[\w$]+)\s*\{'
+    r'|(?P<owner>[\w$]+)\.prototype\.(?P<method>[\w$]+)\s*=\s*function\s*\([^)]*\)',
     re.MULTILINE
 )
+BRACE_PATTERN = re.compile(r'[{}]')
+BRACE_DELTA = {'{': 1, '}': -1}
+
+
+def _brace_table(text: str) -> tuple:
+    """
+    Returns (positions, depths) for every brace in text, where depths[i] is the
+    nesting depth right after brace i. Built with map/accumulate, so there is
+    no per-character or per-line Python loop.
+    """
+    positions = list(map(re.Match.start, BRACE_PATTERN.finditer(text)))
+    depths = list(accumulate(map(BRACE_DELTA.__getitem__, map(text.__getitem__, positions))))
+    return positions, depths
+
+
+def _find_block_end(brace_table: tuple, open_pos: int, default: int) -> int:
+    """
+    Returns the index of the '}' that closes the '{' at open_pos,
+    or default if the block is never closed.
+    """
+    positions, depths = brace_table
+    k = bisect_left(positions, open_pos)
+    try:
+        # The closing brace is the first later one that drops below this depth
+        return positions[depths.index(depths[k] - 1, k + 1)]
+    except ValueError:
+        return default
+
+
+def _make_summary(file_path, imports, requires, functions, classes, prototypes,
+                  total_lines, context_lines, skipped_lines) -> dict:
+    return {
+        "file": str(file_path),
+        "imports": imports,
+        "requires": requires,
+        "functions": functions,
+        "classes": classes,
+        "prototype_methods": prototypes,
+        "stats": {
+            "total_lines": total_lines,
+            "context_lines": context_lines,
+            "skipped_lines": skipped_lines,
+            "non_context_lines": total_lines - context_lines - skipped_lines
+        }
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _get_tree_sitter_parser(language: str):
+    # One parser per grammar per process
+    return get_parser(language)
+
+
+def _node_text(node) -> str:
+    return node.text.decode('utf-8', errors='ignore')
+
+
+def _string_value(node) -> str:
+    # String nodes include their quotes
+    return _node_text(node)[1:-1]
+
+
+def _parse_with_tree_sitter(file_path: Path) -> dict:
+    """
+    Same summary as the regex scanner, built from a tree-sitter syntax tree,
+    so strings, comments, template literals and JSX are handled correctly.
+    """
+    data = file_path.read_bytes()
+    tree = _get_tree_sitter_parser(TREE_SITTER_LANGUAGES[file_path.suffix]).parse(data)
+
+    total_lines = data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+    context_lines = 0
+    skipped_lines = 0
+
+    imports = []
+    requires = []
+    functions = []
+    classes = []
+    prototypes = []
+
+    stack = [tree.root_node]
+    while stack:
+        node = stack.pop()
+        kind = node.type
+
+        if kind == 'import_statement':
+            source = node.child_by_field_name('source')
+            if source is not None:
+                imports.append(_string_value(source))
+                context_lines += 1
+            continue
+
+        if kind in FUNCTION_NODE_TYPES or kind in CLASS_NODE_TYPES:
+            name = node.child_by_field_name('name')
+            if name is not None:
+                target = functions if kind in FUNCTION_NODE_TYPES else classes
+                target.append(_node_text(name))
+                context_lines += 1
+                # Like the regex scanner, don't descend into the body
+                skipped_lines += node.end_point[0] - node.start_point[0]
+                continue
+
+        if kind == 'call_expression':
+            func = node.child_by_field_name('function')
+            args = node.child_by_field_name('arguments')
+            if (func is not None and func.type == 'identifier' and func.text == b'require'
+                    and args is not None and args.named_child_count
+                    and args.named_children[0].type == 'string'):
+                requires.append(_string_value(args.named_children[0]))
+                context_lines += 1
+
+        elif kind == 'assignment_expression':
+            # Owner.prototype.method = function (...) { ... }
+            left = node.child_by_field_name('left')
+            right = node.child_by_field_name('right')
+            if (left is not None and right is not None and left.type == 'member_expression'
+                    and right.type in FUNCTION_VALUE_TYPES):
+                obj = left.child_by_field_name('object')
+                if obj is not None and obj.type == 'member_expression':
+                    prop = obj.child_by_field_name('property')
+                    if prop is not None and prop.text == b'prototype':
+                        owner = obj.child_by_field_name('object')
+                        method = left.child_by_field_name('property')
+                        prototypes.append(f"{_node_text(owner)}.{_node_text(method)}")
+                        context_lines += 1
+                        skipped_lines += node.end_point[0] - node.start_point[0]
+                        continue
+
+        # Reversed so children pop off the stack in source order
+        stack.extend(reversed(node.children))
+
+    return _make_summary(file_path, imports, requires, functions, classes, prototypes,
+                         total_lines, context_lines, skipped_lines)
 
 
 def parse_js_ts_file(file_path: Path) -> dict:
@@ -20,11 +177,18 @@ def parse_js_ts_file(file_path: Path) -> dict:
       - named functions/classes
       - prototype methods
       - basic line stats
+
+    Function, class and prototype bodies are skipped, so nested
+    declarations are not reported and their lines count as skipped.
+    Uses tree-sitter when tree_sitter_languages is installed, the fused
+    regex scanner otherwise.
     """
-    with file_path.open('r', encoding='utf-8', errors='ignore') as f:
-        lines = f.readlines()
+    if get_parser is not None:
+        return _parse_with_tree_sitter(file_path)
 
-    total_lines = len(lines)
+    text = file_path.read_text(encoding='utf-8', errors='ignore')
+
+    total_lines = text.count('\n') + (1 if text and not text.endswith('\n') else 0)
     context_lines = 0
     skipped_lines = 0
 
@@ -34,137 +198,56 @@ def parse_js_ts_file(file_path: Path) -> dict:
     classes = []
     prototypes = []
 
-    inside_block = False
-    brace_count = 0
-    i = 0
-
-    while i < total_lines:
-        line = lines[i]
-
-        if inside_block:
-            skipped_lines += 1
-            brace_count += line.count('{')
-            brace_count -= line.count('}')
-            if brace_count <= 0:
-                inside_block = False
-                brace_count = 0
-            i += 1
+    # An unclosed block runs to the last line (not past the final newline)
+    text_end = len(text) - 1 if text.endswith('\n') else len(text)
+    brace_table = None
+    pos = 0
+    while True:
+        match = JS_TS_PATTERN.search(text, pos)
+        if match is None:
+            break
+        context_lines += 1
+        pos = match.end()
+        kind = match.lastgroup
+
+        if kind == 'import':
+            imports.append(match.group('import'))
             continue
-
-        # Check for import
-        match_import = IMPORT_PATTERN.search(line)
-        if match_import:
-            imports.append(match_import.group(1))
-            context_lines += 1
-
-        # Check for require
-        match_require = REQUIRE_PATTERN.search(line)
-        if match_require:
-            requires.append(match_require.group(1))
-            context_lines += 1
-
-        # Check for function
-        match_func = FUNCTION_PATTERN.search(line)
-        if match_func:
-            functions.append(match_func.group(1))
-            context_lines += 1
-            if '{' not in line:
-                found_open = False
-                while i < total_lines and not found_open:
-                    i += 1
-                    if i >= total_lines:
-                        break
-                    next_line = lines[i]
-                    skipped_lines += 1
-                    if '{' in next_line:
-                        found_open = True
-                        brace_count = 1
-                        inside_block = True
-                i += 1
-                continue
-            else:
-                inside_block = True
-                brace_count = 1
-            i += 1
+        if kind == 'require':
+            requires.append(match.group('require'))
             continue
 
-        # Check for class
-        match_class = CLASS_PATTERN.search(line)
-        if match_class:
-            classes.append(match_class.group(1))
-            context_lines += 1
-            if '{' not in line:
-                found_open = False
-                while i < total_lines and not found_open:
-                    i += 1
-                    if i >= total_lines:
-                        break
-                    next_line = lines[i]
-                    skipped_lines += 1
-                    if '{' in next_line:
-                        found_open = True
-                        brace_count = 1
-                        inside_block = True
-                i += 1
-                continue
-            else:
-                inside_block = True
-                brace_count = 1
-            i += 1
-            continue
+        if kind == 'function':
+            functions.append(match.group('function'))
+        elif kind == 'class':
+            classes.append(match.group('class'))
+        else:
+            prototypes.append(f"{match.group('owner')}.{match.group('method')}")
 
-        # Check for prototype method
-        match_proto = PROTOTYPE_METHOD_PATTERN.search(line)
-        if match_proto:
-            class_name, method_name = match_proto.groups()
-            prototypes.append(f"{class_name}.{method_name}")
-            context_lines += 1
-            if '{' not in line:
-                found_open = False
-                while i < total_lines and not found_open:
-                    i += 1
-                    if i >= total_lines:
-                        break
-                    next_line = lines[i]
-                    skipped_lines += 1
-                    if '{' in next_line:
-                        found_open = True
-                        brace_count = 1
-                        inside_block = True
-                i += 1
-                continue
-            else:
-                inside_block = True
-                brace_count = 1
-            i += 1
+        # Skip the declaration body (the class pattern already consumed its '{')
+        open_pos = text.find('{', match.end() - 1)
+        if open_pos == -1:
             continue
+        if brace_table is None:
+            brace_table = _brace_table(text)
+        close_pos = _find_block_end(brace_table, open_pos, text_end)
+        skipped_lines += text.count('\n', match.start(), close_pos)
+        pos = close_pos + 1
 
-        i += 1
-
-    return {
-        "file": str(file_path),
-        "imports": imports,
-        "requires": requires,
-        "functions": functions,
-        "classes": classes,
-        "prototype_methods": prototypes,
-        "stats": {
-            "total_lines": total_lines,
-            "context_lines": context_lines,
-            "skipped_lines": skipped_lines,
-            "non_context_lines": total_lines - context_lines - skipped_lines
-        }
-    }
+    return _make_summary(file_path, imports, requires, functions, classes, prototypes,
+                         total_lines, context_lines, skipped_lines)
 
 
-def gather_js_ts_summary(root_dir: Path):
+def gather_js_ts_summary(root_dir: Path, max_workers: int = None, ignore_dirs=frozenset()):
     """
-    Walks through root_dir to parse JS/TS files and return a list of summaries.
+    Walks through root_dir (skipping ignore_dirs) to parse JS/TS files and
+    return a list of summaries.
+    Parsing is CPU-bound regex work, so files are spread across a process pool.
     """
-    summaries = []
-    for dirpath, _, filenames in os.walk(root_dir):
-        for fname in filenames:
-            if fname.endswith(('.js', '.jsx', '.ts', '.tsx')):
-                fpath = Path(dirpath) / fname
-                summaries.append(parse_js_ts_file(fpath))
-    return summaries
+    skip_dir = frozenset(ignore_dirs).__contains__
+    paths = [Path(entry.path) for entry in iter_files(str(root_dir), JS_TS_EXTENSIONS, skip_dir)]
+
+    if not paths:
+        return []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(parse_js_ts_file, paths, chunksize=32))
@@ -1,6 +1,33 @@
 import re
 import os
 import json
+import mmap
+from contextlib import contextmanager
+
+# Regex to match function/method definitions (compiled once at import).
+# Bytes pattern, so lines are matched without decoding the file first.
+# [ \t] keeps a match on one line, so it also works on a whole buffer.
+METHOD_RE = re.compile(rb'\b(?:[a-zA-Z_][a-zA-Z0-9_:<>]*)[ \t]+([a-zA-Z_][a-zA-Z0-9_]*)[ \t]*\(.*\)')
+
+# A comment line: after trimming whitespace it starts with // or /*, or ends with */.
+# Group 1 is the trimmed line.
+COMMENT_LINE_RE = re.compile(rb'^[ \t\r\f\v]*((?://|/\*)[^\n]*?|[^\n]*?\*/)[ \t\r\f\v]*$', re.MULTILINE)
+
+# Files above this size are memory-mapped rather than read into a bytes copy
+MMAP_THRESHOLD = 64 * 1024
+
+@contextmanager
+def open_source(file_path):
+    """
+    Yields the contents of a file as a bytes-like object for regex scanning.
+    Large files are memory-mapped so the page cache backs the scan directly.
+    """
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size > MMAP_THRESHOLD:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield data
+        else:
+            yield file.read()
 
 def extract_methods(file_path):
     """
@@ -15,32 +42,28 @@ def extract_methods(file_path):
     methods = []
 
     try:
-        with open(file_path, 'r') as file:
-            lines = file.readlines()
-
-        # Regex to match function/method definitions
-        method_regex = re.compile(r'\b(?:[a-zA-Z_][a-zA-Z0-9_:<>]*)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)')
-
-        # Temporary variables to hold method and comment context
-        current_comment = []
-        for line in lines:
-            line = line.strip()
-
-            # Capture comments
-            if line.startswith("//"):
-                current_comment.append(line.strip("// "))
-            elif line.startswith("/*") or line.endswith("*/"):
-                current_comment.append(line.strip("/* ").strip("*/"))
-
-            # Check for method definitions
-            match = method_regex.search(line)
-            if match:
-                method_name = match.group(1)
+        with open_source(file_path) as data:
+            # Comments are collected from the lines between one method and the
+            # next (the method's own line included), so only those spans get scanned
+            comment_start = 0
+            for match in METHOD_RE.finditer(data):
+                line_end = data.find(b"\n", match.end())
+                if line_end == -1:
+                    line_end = len(data)
+
+                current_comment = []
+                for comment in COMMENT_LINE_RE.finditer(data, comment_start, line_end):
+                    line = comment.group(1)
+                    if line.startswith(b"//"):
+                        current_comment.append(line.strip(b"// "))
+                    else:
+                        current_comment.append(line.strip(b"/* ").strip(b"*/"))
+
                 methods.append({
-                    "method": method_name,
-                    "comments": " ".join(current_comment)
+                    "method": match.group(1).decode('ascii'),
+                    "comments": b" ".join(current_comment).decode('utf-8', 'replace')
                 })
-                current_comment = []  # Reset comments after capturing
+                comment_start = line_end
 
     except FileNotFoundError:
         print(f"File not found: {file_path}")
@@ -49,7 +72,24 @@ def extract_methods(file_path):
 
     return methods
 
-if __name__ == "__main__":
+def extract_method_names(file_path):
+    """
+    Extracts only the method names from a C++ file, in one regex pass over
+    the whole buffer. Unreadable files yield an empty list.
+
+    Args:
+        file_path (str): Path to the C++ file.
+
+    Returns:
+        list: A list of {"method": name} dictionaries.
+    """
+    try:
+        with open_source(file_path) as data:
+            return [{"method": m.group(1).decode('ascii')} for m in METHOD_RE.finditer(data)]
+    except OSError:
+        return []
+
+def main():
     # Replace with the path to your C++ file
     file_path = "luascript.cpp"
 
@@ -67,4 +107,7 @@ if __name__ == "__main__":
         else:
             print("No methods found in the file.")
     else:
-        print(f"The file '{file_path}' does not exist. Please provide a valid path.")
\ No newline at end of file
+        print(f"The file '{file_path}' does not exist. Please provide a valid path.")
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,23 @@
-import re, os, json
+import os, json
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_methods(file_path):
-    methods = []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        regex = re.compile(r'\b(?:[a-zA-Z_][a-zA-Z0-9_:<>]*)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)')
-        for line in lines:
-            line = line.strip()
-            match = regex.search(line)
-            if match:
-                methods.append({"method": match.group(1)})
-    except: pass
-    return methods
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shares the regex and file scan with the single-file extractor
+from extract_methods import extract_method_names
 
 def extract_from_dir(directory):
+    paths = [os.path.join(root, file)
+             for root, _, files in os.walk(directory)
+             for file in files if file.endswith(('.cpp', '.h'))]
     data = {}
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith(('.cpp', '.h')):
-                methods = extract_methods(os.path.join(root, file))
-                if methods: data[file] = methods
+    # Regex scanning is CPU-bound; processes sidestep the GIL
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        for path, methods in zip(paths, ex.map(extract_method_names, paths, chunksize=32)):
+            if methods: data[os.path.basename(path)] = methods
     return data
 
 if __name__ == "__main__":
@@ -28,8 +25,12 @@ if __name__ == "__main__":
     if os.path.isdir(dir_path):
         result = extract_from_dir(dir_path)
         if result:
-            with open("methods.json", 'w', encoding='utf-8') as f:
-                json.dump(result, f)
+            if orjson is not None:
+                with open("methods.json", 'wb') as f:
+                    f.write(orjson.dumps(result))
+            else:
+                with open("methods.json", 'w', encoding='utf-8') as f:
+                    json.dump(result, f)
             print("Extraction complete. Results saved to methods.json.")
         else: print("No methods found.")
     else: print(f"Invalid directory: {dir_path}")
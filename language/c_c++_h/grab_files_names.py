@@ -1,5 +1,4 @@
-import os
-from datetime import datetime
+from source_files import iter_source_files
 
 config = {
     'file_extensions': ['.js', '.jsx', '.ts', '.tsx', '.json'],
@@ -12,42 +11,20 @@ config = {
     'recursive': True
 }
 
-def should_ignore_file(file_path):
-    # Check if it matches any "ignore_extensions"
-    if any(file_path.endswith(ext) for ext in config['ignore_extensions']):
-        return True
-
-    # Check if filename is in "ignore_files"
-    if os.path.basename(file_path) in config['ignore_files']:
-        return True
-
-    # Check file size
-    if os.path.getsize(file_path) > config['max_file_size']:
-        return True
-
-    # Check last modified date
-    file_mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-    if file_mod_time < datetime.strptime(config['modified_after'], '%Y-%m-%d'):
-        return True
-
-    return False
+# Number of paths buffered before each writelines call
+WRITE_BATCH_SIZE = 4096
 
 def write_file_names():
     with open(config['output_filename'], 'w', encoding='utf-8') as output_file:
-        for root, dirs, files in os.walk('.', topdown=True):
-            # Filter out directories we want to ignore
-            dirs[:] = [d for d in dirs if d not in config['ignore_directories']]
-
-            for file in files:
-                # Only process files that match our listed file extensions
-                if any(file.endswith(ext) for ext in config['file_extensions']):
-                    file_path = os.path.join(root, file)
-
-                    if should_ignore_file(file_path):
-                        continue
-
-                    # Write the file path (relative to the current directory) to the output file
-                    output_file.write(f'{file_path}\n')
+        # Collect paths and hand them over in batches rather than one write per file
+        batch = []
+        for file_path, _ in iter_source_files(config):
+            # Queue the file path (relative to the current directory) for the output file
+            batch.append(f'{file_path}\n')
+            if len(batch) >= WRITE_BATCH_SIZE:
+                output_file.writelines(batch)
+                batch.clear()
+        output_file.writelines(batch)
 
 if __name__ == '__main__':
     write_file_names()
\ No newline at end of file
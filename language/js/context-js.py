@@ -3,14 +3,178 @@
 import os
 import re
 import json
+import hashlib
+import functools
 import sys
 from pathlib import Path
+from bisect import bisect_left
+from itertools import accumulate
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-# Regex patterns for detecting imports/requires and function/class definitions
-IMPORT_PATTERN = re.compile(r'^\s*import\s+(?:[\w*\s{},]+from\s+)?["\']([^"\']+)["\']', re.MULTILINE)
-REQUIRE_PATTERN = re.compile(r'\brequire\s*\(\s*["\']([^"\']+)["\']\s*\)')
-FUNCTION_PATTERN = re.compile(r'(?:export\s+)?function\s+([\w$]+)\s*\(', re.MULTILINE)
-CLASS_PATTERN = re.compile(r'(?:export\s+)?class\s+([\w$]+)\s*\{', re.MULTILINE)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import re2  # google-re2: linear-time DFA matching, same API as re
+except ImportError:
+    re2 = None
+
+try:
+    from tree_sitter_languages import get_parser
+except ImportError:  # optional: fall back to the regex scanner
+    get_parser = None
+
+# Regex patterns for detecting imports/requires and function/class definitions,
+# fused into one alternation so the whole file is scanned in a single pass.
+# The outer group that matched (match.lastindex) tells us the kind; the group
+# right after it captures the source/name. The patterns are pure ASCII, so they
+# run on the raw bytes and only the captured values get decoded. Compiled with
+# google-re2 when it is installed, so flags are inline and kinds are looked up
+# by group number (re2 reports group names as bytes).
+MASTER_PATTERN = (re2 or re).compile(
+    rb'(?m)(?P<imp>^\s*import\s+(?:[\w*\s{},]+from\s+)?["\']([^"\']+)["\'])'
+    rb'|(?P<req>\brequire\s*\(\s*["\']([^"\']+)["\']\s*\))'
+    rb'|(?P<fn>(?:export\s+)?function\s+([\w$]+)\s*\()'
+    rb'|(?P<cls>(?:export\s+)?class\s+([\w$]+)\s*\{)'
+)
+KIND_BY_GROUP = {1: 'imp', 3: 'req', 5: 'fn', 7: 'cls'}
+
+# tree-sitter grammar per extension
+TREE_SITTER_LANGUAGES = {
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'tsx',
+}
+FUNCTION_NODE_TYPES = ('function_declaration', 'generator_function_declaration')
+CLASS_NODE_TYPES = ('class_declaration', 'abstract_class_declaration')
+
+# Per-file summaries from the last run, kept in the working directory (next to
+# .file_checksums.json), keyed by path and checked against mtime/size; a file
+# whose stat changed but whose content hash didn't (a checkout, a touch, a
+# copy) still reuses its summary
+CACHE_FILE = '.js_ctx_cache.json'
+
+# Files sent to a worker per task, and tasks kept in flight per worker; the
+# walk only runs this far ahead of the output
+BATCH_SIZE = 32
+MAX_INFLIGHT_PER_WORKER = 4
+
+# Content hashes that already have a cached summary, set once per worker
+# process by init_worker
+known_hashes = frozenset()
+
+BRACE_PATTERN = re.compile(rb'[{}]')
+BRACE_DELTA = {ord('{'): 1, ord('}'): -1}
+
+def brace_table(text):
+    """
+    Return (positions, depths) for every brace in text, where depths[i] is the
+    nesting depth right after brace i. One finditer pass over the whole buffer,
+    so matching any number of blocks afterwards never rescans the text.
+    """
+    positions = [m.start() for m in BRACE_PATTERN.finditer(text)]
+    depths = list(accumulate(map(BRACE_DELTA.__getitem__, map(text.__getitem__, positions))))
+    return positions, depths
+
+def find_block_end(table, open_index, default):
+    """
+    Given the index of an opening '{', return the index of its matching '}'
+    (or default if it never closes), using the table from brace_table.
+    """
+    positions, depths = table
+    k = bisect_left(positions, open_index)
+    try:
+        # The closing brace is the first later one that drops below this depth
+        return positions[depths.index(depths[k] - 1, k + 1)]
+    except ValueError:
+        return default
+
+@functools.lru_cache(maxsize=None)
+def get_tree_sitter_parser(language):
+    # One parser per grammar per process
+    return get_parser(language)
+
+def parse_with_tree_sitter(file_path: Path):
+    """
+    Same summary as the regex scanner, built from a tree-sitter syntax tree,
+    so braces inside strings, comments, regexes and JSX don't confuse it.
+    """
+    with open(file_path, 'rb') as f:
+        text = f.read()
+    tree = get_tree_sitter_parser(TREE_SITTER_LANGUAGES[file_path.suffix]).parse(text)
+
+    imports = []
+    requires = []
+    functions = []
+    classes = []
+
+    total_lines = text.count(b'\n') + (1 if text and not text.endswith(b'\n') else 0)
+    context_lines = 0
+    skipped_lines = 0
+    last_context_line = -1
+
+    stack = [tree.root_node]
+    while stack:
+        node = stack.pop()
+        kind = node.type
+        value = None
+        is_block = False
+
+        if kind == 'import_statement':
+            source = node.child_by_field_name('source')
+            if source is not None:
+                # String nodes include their quotes
+                value = source.text[1:-1]
+                imports.append(value.decode('utf-8', 'replace'))
+        elif kind in FUNCTION_NODE_TYPES or kind in CLASS_NODE_TYPES:
+            name = node.child_by_field_name('name')
+            if name is not None:
+                value = name.text
+                target = functions if kind in FUNCTION_NODE_TYPES else classes
+                target.append(value.decode('utf-8', 'replace'))
+                is_block = True
+        elif kind == 'call_expression':
+            func = node.child_by_field_name('function')
+            args = node.child_by_field_name('arguments')
+            if (func is not None and func.type == 'identifier' and func.text == b'require'
+                    and args is not None and args.named_child_count
+                    and args.named_children[0].type == 'string'):
+                value = args.named_children[0].text[1:-1]
+                requires.append(value.decode('utf-8', 'replace'))
+
+        if value is not None:
+            # Each line holding a match counts once, as in the regex scanner
+            row = node.start_point[0]
+            if row != last_context_line:
+                context_lines += 1
+                last_context_line = row
+            if is_block:
+                # Don't descend into the body; its lines count as skipped
+                skipped_lines += node.end_point[0] - row
+                continue
+            if kind == 'import_statement':
+                continue
+
+        # Reversed so children pop off the stack in source order
+        stack.extend(reversed(node.children))
+
+    return {
+        "file": str(file_path),
+        "imports": imports,
+        "requires": requires,
+        "functions": functions,
+        "classes": classes,
+        "stats": {
+            "total_lines": total_lines,
+            "context_lines": context_lines,
+            "skipped_lines": skipped_lines,
+            "non_context_lines": total_lines - context_lines - skipped_lines
+        }
+    }
 
 def parse_javascript_file(file_path: Path):
     """
@@ -20,136 +184,68 @@ def parse_javascript_file(file_path: Path):
       - Log how many lines are read, how many are 'context lines',
         and how many are 'skipped lines' (inside function/class bodies).
 
-    Returns a dict summarizing the info.
+    Uses tree-sitter when tree_sitter_languages is installed, the fused
+    regex scanner otherwise. Returns a dict summarizing the info.
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+    if get_parser is not None:
+        return parse_with_tree_sitter(file_path)
+
+    with open(file_path, 'rb') as f:
+        text = f.read()
 
     imports = []
     requires = []
     functions = []
     classes = []
+    # Each match goes straight into its kind's list, no if/elif chain per match
+    found = {'imp': imports, 'req': requires, 'fn': functions, 'cls': classes}
 
-    total_lines = len(lines)
+    total_lines = text.count(b'\n') + (1 if text and not text.endswith(b'\n') else 0)
     context_lines = 0
     skipped_lines = 0
 
-    # We'll iterate line by line, tracking whether we are inside a function/class block.
-    # This is naive. We track curly braces once we see a function or class signature,
-    # and keep skipping lines until braces close.
-    inside_block = False
-    block_brace_count = 0
-
-    # For capturing aggregated text if needed
-    # but here we'll just skip them from context.
-    
-    # Pre-compile single-line regexes we can apply per line:
-    import_line_regex = re.compile(r'^\s*import\s+(?:[\w*\s{},]+from\s+)?["\']([^"\']+)["\']')
-    require_line_regex = re.compile(r'\brequire\s*\(\s*["\']([^"\']+)["\']\s*\)')
-    function_line_regex = re.compile(r'(?:export\s+)?function\s+([\w$]+)\s*\(')
-    class_line_regex = re.compile(r'(?:export\s+)?class\s+([\w$]+)\s*\{')
-
-    def check_if_signature_line(line):
-        """
-        Check if the line has an import, require, function, or class definition.
-        Return a tuple: (found_something, found_import, found_require, found_function, found_class)
-        """
-        found_import = import_line_regex.search(line)
-        found_require = require_line_regex.search(line)
-        found_function = function_line_regex.search(line)
-        found_class = class_line_regex.search(line)
-
-        found_something = bool(found_import or found_require or found_function or found_class)
-        return found_something, found_import, found_require, found_function, found_class
-
-    i = 0
-    while i < total_lines:
-        line = lines[i]
-        # If we are currently inside a block (function or class body) that we want to skip:
-        if inside_block:
-            skipped_lines += 1
-            # Check for '{' or '}' to track nested braces
-            open_braces = line.count('{')
-            close_braces = line.count('}')
-            block_brace_count += open_braces
-            block_brace_count -= close_braces
-
-            if block_brace_count <= 0:
-                # We've matched the function/class block braces, exit skipping mode
-                inside_block = False
-                block_brace_count = 0
-
-            i += 1
-            continue
+    # An unclosed block runs to the last line (not past the final newline)
+    text_end = len(text) - 1 if text.endswith(b'\n') else len(text)
+
+    # Running line number of the last match, so each context line counts once
+    line_no = 0
+    line_pos = 0
+    last_context_line = -1
 
-        # Not inside a block: check for import/require or function/class signature
-        found_something, found_import, found_require, found_function, found_class = check_if_signature_line(line)
-        if found_something:
+    # Built on the first function/class body, then shared by every later one
+    table = None
+
+    pos = 0
+    while True:
+        match = MASTER_PATTERN.search(text, pos)
+        if match is None:
+            break
+        kind = KIND_BY_GROUP[match.lastindex]
+        value = match.group(match.lastindex + 1).decode('utf-8', 'replace')
+        value_start = match.start(match.lastindex + 1)
+
+        line_no += text.count(b'\n', line_pos, value_start)
+        line_pos = value_start
+        if line_no != last_context_line:
             context_lines += 1
+            last_context_line = line_no
 
-            if found_import:
-                imports.append(found_import.group(1))
-
-            if found_require:
-                requires.append(found_require.group(1))
-
-            if found_function:
-                functions.append(found_function.group(1))
-                # We should skip the function body now
-                # Attempt to detect the opening '{' in the same line
-                # If not found, we look in subsequent lines.
-                # Then we'll track braces until they match again.
-                # This is naive and might fail for complicated multiline definitions.
-                # But let's do a best-effort approach:
-                # find the first '{' after the function signature
-                brace_index = line.find('{')
-                if brace_index == -1:
-                    # Move to next line(s) until we find the opening brace
-                    open_brace_found = False
-                    while i < total_lines and not open_brace_found:
-                        i += 1
-                        if i >= total_lines:
-                            break
-                        line = lines[i]
-                        skipped_lines += 1  # We consider these lines as inside function definition
-                        brace_index = line.find('{')
-                        if brace_index != -1:
-                            open_brace_found = True
-                    if not open_brace_found:
-                        # If we never found an opening brace, let's continue scanning
-                        continue
-                # We found an opening '{' in the current or a subsequent line
-                inside_block = True
-                block_brace_count = 1  # we have one unmatched '{'
-            
-            if found_class:
-                classes.append(found_class.group(1))
-                # Similarly skip the class body
-                brace_index = line.find('{')
-                if brace_index == -1:
-                    # Move to next line(s) until we find the opening brace
-                    open_brace_found = False
-                    while i < total_lines and not open_brace_found:
-                        i += 1
-                        if i >= total_lines:
-                            break
-                        line = lines[i]
-                        skipped_lines += 1
-                        brace_index = line.find('{')
-                        if brace_index != -1:
-                            open_brace_found = True
-                    if not open_brace_found:
-                        # If we never found an opening brace, let's continue
-                        continue
-                # We found an opening '{'
-                inside_block = True
-                block_brace_count = 1
-
-            # Move to next line
-            i += 1
-        else:
-            # If it's just a normal line outside any function/class, we count it as read but not context
-            i += 1
+        pos = match.end()
+        found[kind].append(value)
+        if kind == 'imp' or kind == 'req':
+            continue
+
+        # Skip the function/class body. This is naive (braces inside strings
+        # or comments are counted too), but good enough for a summary.
+        open_index = text.find(b'{', match.end() - 1)
+        if open_index == -1:
+            continue
+        if table is None:
+            table = brace_table(text)
+        close_index = find_block_end(table, open_index, len(text))
+        # Lines after the signature line, up to the one holding the closing brace
+        skipped_lines += text.count(b'\n', value_start, min(close_index, text_end))
+        pos = close_index + 1
 
     file_stats = {
         "file": str(file_path),
@@ -168,43 +264,237 @@ def parse_javascript_file(file_path: Path):
     return file_stats
 
 
-def gather_js_context(root_directory: Path, output_file: Path = None):
+def to_json(summary):
+    """Serialize one file summary, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(summary, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(summary, indent=2)
+
+
+def write_json_stream(summaries, out):
+    """
+    Write summaries to out as a JSON array, one element at a time, so nothing
+    has to hold the whole list. Returns the number of summaries written.
+    """
+    count = 0
+    out.write('[')
+    for summary in summaries:
+        out.write(',\n' if count else '\n')
+        out.write(to_json(summary))
+        count += 1
+    out.write('\n]\n')
+    return count
+
+
+def to_columns(summaries):
+    """
+    Pivot summaries into one list per field, indexed by file position
+    (stats become one list per counter), so keys aren't repeated per file.
+    """
+    columns = {}
+    for summary in summaries:
+        for key, value in summary.items():
+            if isinstance(value, dict):
+                nested = columns.setdefault(key, {})
+                for sub_key, sub_value in value.items():
+                    nested.setdefault(sub_key, []).append(sub_value)
+            else:
+                columns.setdefault(key, []).append(value)
+    return columns
+
+
+def write_json_columns(summaries, out):
+    """
+    Write summaries to out as a single columnar JSON object (see to_columns).
+    Returns the number of summaries written.
+    """
+    columns = to_columns(summaries)
+    out.write(to_json(columns))
+    out.write('\n')
+    return len(columns.get('file', []))
+
+
+def file_hash(file_path):
+    """BLAKE2b hex digest of a file's content, for the summary cache."""
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'blake2b').hexdigest()
+
+
+def init_worker(hashes):
+    """Pool initializer: hands each worker the hashes that have a cached summary."""
+    global known_hashes
+    known_hashes = hashes
+
+
+def summarize_file(file_path):
+    """
+    Worker task for a cache miss: returns (content hash, summary). The summary
+    is None when the hash is in known_hashes, i.e. the content was already
+    summarized under another path or mtime, so the file isn't parsed again.
+    """
+    digest = file_hash(file_path)
+    if digest in known_hashes:
+        return digest, None
+    return digest, parse_javascript_file(file_path)
+
+
+def summarize_batch(file_paths):
+    """Worker task: summarize_file for each path, so small files share one round trip."""
+    return [summarize_file(file_path) for file_path in file_paths]
+
+
+def load_cache(cache_path=CACHE_FILE):
+    """Load the path -> {mtime_ns, size, hash, result} cache from a previous run, or {}."""
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def cached_summary(entry, st):
+    """
+    Return entry's summary if it is a well-formed cache entry whose mtime and
+    size match st, else None; a damaged entry is just a cache miss.
+    """
+    if (isinstance(entry, dict) and entry.get('mtime_ns') == st.st_mtime_ns
+            and entry.get('size') == st.st_size and isinstance(entry.get('result'), dict)):
+        return entry['result']
+    return None
+
+
+def save_cache(cache, cache_path=CACHE_FILE):
+    """Write the cache to a temp file and rename it into place, so it is never left half-written."""
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(cache) if orjson is not None else json.dumps(cache).encode('utf-8'))
+    os.replace(tmp_path, cache_path)
+
+
+def iter_js_entries(directory):
+    """
+    Yield os.DirEntry objects for the .js/.jsx/.ts/.tsx files under directory,
+    in the same order os.walk would visit them. scandir's entries carry the
+    file's stat, so it isn't fetched separately for every file.
+    """
+    subdirs = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir():
+                    # Like os.walk, don't descend into symlinked directories
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(('.js', '.jsx', '.ts', '.tsx')):
+                    yield entry
+    except OSError:
+        return  # unreadable directory: skipped, as os.walk does
+    for subdir in subdirs:
+        yield from iter_js_entries(subdir)
+
+def gather_js_context(root_directory: Path, output_file: Path = None, columnar: bool = False,
+                      cache_path=CACHE_FILE):
     """
     Recursively walk through the given directory, parse .js and .ts files,
-    and gather a list of context objects containing imports, requires, 
-    function names, class names, and some code stats.
+    and stream context objects containing imports, requires, function names,
+    class names, and some code stats out as a JSON array (or, with columnar,
+    as one object holding a list per field).
+    Files whose mtime and size match the previous run reuse its cached summary
+    (read from and saved to cache_path).
+    Returns the list of summaries, in output order.
     """
-    context_list = []
+    cache = load_cache(cache_path)
+    # Every summary stays in the new cache and the returned list, so memory
+    # still grows with the tree; only the walk-ahead below is bounded
+    new_cache = {}
+    all_results = []
+    # Content hash -> summary, for files whose mtime/size no longer match
+    by_hash = {entry['hash']: entry['result'] for entry in cache.values()
+               if isinstance(entry, dict) and isinstance(entry.get('hash'), str)
+               and isinstance(entry.get('result'), dict)}
 
-    for dirpath, _, filenames in os.walk(root_directory):
-        for fname in filenames:
-            if fname.endswith(('.js', '.jsx', '.ts', '.tsx')):
-                file_path = Path(dirpath) / fname
-                file_summary = parse_javascript_file(file_path)
-                context_list.append(file_summary)
+    def batches():
+        # Walk lazily, BATCH_SIZE files at a time, as
+        # (path, stat, content hash, cached summary or None if the file must be parsed)
+        batch = []
+        for dir_entry in iter_js_entries(root_directory):
+            file_path = Path(dir_entry.path)
+            st = dir_entry.stat()
+            entry = cache.get(str(file_path))
+            result = cached_summary(entry, st)
+            batch.append((file_path, st, entry.get('hash') if result is not None else None, result))
+            if len(batch) == BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
 
-    # Optionally write to JSON file
-    if output_file:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(context_list, f, indent=2)
-        print(f"Context information written to: {output_file}")
-    else:
-        # Otherwise, just print results to stdout
-        print(json.dumps(context_list, indent=2))
+    def finish(batch, future):
+        # Merge a batch's cache hits with its fresh parses, keeping walk order
+        parsed = iter(future.result()) if future is not None else None
+        for file_path, st, digest, result in batch:
+            if result is None:
+                digest, result = next(parsed)
+                if result is None:
+                    # Same content as a cached file (a copy, rename or touch)
+                    result = {**by_hash[digest], "file": str(file_path)}
+            new_cache[str(file_path)] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size,
+                                         "hash": digest, "result": result}
+            all_results.append(result)
+            yield result
+
+    # Hashing and parsing are spread across processes (no GIL); the workers
+    # skip parsing any file whose hash already has a summary. Batches are
+    # submitted as the walk finds them and written in walk order as soon as
+    # they're ready, so output starts before the walk is done.
+    workers = os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(frozenset(by_hash),)) as executor:
+
+        def summaries():
+            pending = deque()  # (batch, future or None if all cached), in walk order
+            for batch in batches():
+                misses = [file_path for file_path, _, _, result in batch if result is None]
+                pending.append((batch, executor.submit(summarize_batch, misses) if misses else None))
+                # Write whatever is ready; block only once the walk is too far ahead
+                while pending and (len(pending) > workers * MAX_INFLIGHT_PER_WORKER
+                                   or pending[0][1] is None or pending[0][1].done()):
+                    yield from finish(*pending.popleft())
+            while pending:
+                yield from finish(*pending.popleft())
+
+        write = write_json_columns if columnar else write_json_stream
+
+        # Optionally write to JSON file
+        if output_file:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                write(summaries(), f)
+            print(f"Context information written to: {output_file}")
+        else:
+            # Otherwise, just print results to stdout
+            write(summaries(), sys.stdout)
 
-    return context_list
+    try:
+        save_cache(new_cache, cache_path)
+    except OSError as e:
+        # The output is already written; a missing cache only costs the next run
+        print(f"Could not save the summary cache to {cache_path}: {e}", file=sys.stderr)
+    return all_results
 
 
 if __name__ == "__main__":
     """
     Usage:
-        python gather_js_context.py /path/to/your/js/project [output.json]
+        python gather_js_context.py /path/to/your/js/project [output.json] [--columnar]
     """
-    if len(sys.argv) < 2:
+    columnar = '--columnar' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--columnar']
+    if len(args) < 1:
         print("Please provide a root directory for scanning JavaScript/TypeScript files.")
         sys.exit(1)
 
-    root_dir = Path(sys.argv[1])
-    output_path = Path(sys.argv[2]) if len(sys.argv) > 2 else None
+    root_dir = Path(args[0])
+    output_path = Path(args[1]) if len(args) > 1 else None
 
-    gather_js_context(root_dir, output_path)
\ No newline at end of file
+    gather_js_context(root_dir, output_path, columnar)
\ No newline at end of file
@@ -0,0 +1,44 @@
+import os
+from datetime import datetime
+
+def iter_source_files(config, root='.'):
+    """
+    Yield (path, stat_result) for every file under root that passes the
+    filters in config, in the same order os.walk would visit them. Walks
+    with os.scandir and an explicit stack, so each directory is listed once
+    and each file is stat'ed once. Unreadable directories are skipped, as
+    os.walk does.
+    """
+    keep_ext = tuple(config['file_extensions'])
+    ignore_ext = tuple(config['ignore_extensions'])
+    ignore_files = frozenset(config['ignore_files'])
+    ignore_dirs = frozenset(config['ignore_directories'])
+    max_size = config['max_file_size']
+    cutoff = datetime.strptime(config['modified_after'], '%Y-%m-%d').timestamp()
+
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        subdirs = []
+        with it:
+            for entry in it:
+                if entry.is_dir():
+                    # Like os.walk, don't descend into symlinked directories
+                    if not entry.is_symlink() and entry.name not in ignore_dirs:
+                        subdirs.append(entry.path)
+                    continue
+
+                name = entry.name
+                if not name.endswith(keep_ext) or name.endswith(ignore_ext) or name in ignore_files:
+                    continue
+
+                st = entry.stat()  # cached on the DirEntry
+                if st.st_size > max_size or st.st_mtime < cutoff:
+                    continue
+
+                yield entry.path, st
+        # Reversed so subdirectories pop off the stack in listing order, like os.walk
+        stack.extend(reversed(subdirs))
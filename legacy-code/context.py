@@ -9,7 +9,9 @@ patterns, concurrent reading, optional compression, and more.
 Examples:
     python context.py --output context.txt --modified-after 2024-01-01
     python context.py --compress --ignore-pattern ".*secret.*"
+    python context.py --compress --compress-level 6
     python context.py --ignore-file "README.md" --ignore-file "setup.py"
+    python context.py --incremental
 
 Author: You :)
 """
@@ -17,13 +19,32 @@ Author: You :)
 import os
 import re
 import sys
+import io
 import gzip
 import json
+import mmap
 import argparse
 import hashlib
 import logging
+import queue
+import threading
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the json module
+    orjson = None
+
+try:
+    from isal import igzip  # ISA-L: SIMD deflate, several times faster than zlib
+except ImportError:  # optional: fall back to the gzip module
+    igzip = None
+
+try:
+    import blake3
+except ImportError:  # optional: fall back to hashlib's BLAKE2b
+    blake3 = None
 
 # -----------------------------------------------------------------------------
 # Default Configuration
@@ -77,10 +98,37 @@ DEFAULT_CONFIG = {
     'threads': 8,                     # Number of threads for concurrent reading
     'output_filename': 'context.txt',  # Default output name
     'compress_output': False,          # If True, will produce context.txt.gz
+    'compress_level': 1,               # gzip level; 1 favors speed, the dump is rarely kept long
     'checksum_cache': '.file_checksums.json',  # Cache file for checksums to skip unchanged files
     'use_checksum_cache': False,       # If True, uses (and updates) the checksum cache
+    'incremental': False,              # If True, unchanged files are copied from the previous output
 }
 
+# Checksums only answer "has this file changed?", so the much faster BLAKE3 is
+# used when installed. The algorithm is stored with each cache entry, so
+# entries made with a different one are simply treated as changed.
+HASH_ALGO = 'blake3' if blake3 is not None else 'blake2b'
+
+# Read size for the BLAKE2b fallback loop (only used when mmap isn't possible)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Chunk size when copying file contents into the output through Python
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# posix_fadvise (Linux/most Unix) lets files be prefetched without reading them here
+HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+# Write buffer in front of the output (and of the gzip compressor)
+OUTPUT_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Files handed to a worker thread per task, so small files don't each pay
+# for a future and a trip through the executor queue
+BATCH_SIZE = 32
+
+# Batches submitted but not yet written, per thread; keeps the queue of
+# futures (and open work) bounded on huge trees
+MAX_INFLIGHT_PER_THREAD = 4
+
 # -----------------------------------------------------------------------------
 # Argument Parsing
 # -----------------------------------------------------------------------------
@@ -101,6 +149,15 @@ def parse_args():
         action='store_true',
         help='If set, the context file will be compressed using gzip (output .gz).'
     )
+    parser.add_argument(
+        '--compress-level',
+        dest='compress_level',
+        type=int,
+        choices=range(0, 10),
+        metavar='{0-9}',
+        default=DEFAULT_CONFIG['compress_level'],
+        help='gzip compression level used with --compress (1 = fastest, 9 = smallest).'
+    )
     parser.add_argument(
         '--modified-after',
         dest='modified_after',
@@ -131,7 +188,14 @@ def parse_args():
         '--use-checksum',
         dest='use_checksum_cache',
         action='store_true',
-        help='Use MD5 checksums to skip unchanged files (cache stored in .file_checksums.json).'
+        help='Use checksums (BLAKE3 if installed, else BLAKE2b) to skip unchanged files (cache stored in .file_checksums.json).'
+    )
+    parser.add_argument(
+        '--incremental',
+        dest='incremental',
+        action='store_true',
+        help='Implies --use-checksum, but unchanged files are kept: their sections are copied from the '
+             'previous output instead of re-reading the sources. Not available with --compress.'
     )
     parser.add_argument(
         '--verbose',
@@ -167,87 +231,401 @@ def load_checksum_cache(cache_path):
         return {}
 
 def save_checksum_cache(cache_path, checksum_dict):
-    """Save the checksum dictionary to a JSON file."""
+    """Save the checksum dictionary to a JSON file, in one write (via orjson when installed)."""
     try:
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(checksum_dict, f, indent=2)
+        if orjson is not None:
+            data = orjson.dumps(checksum_dict, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(checksum_dict, indent=2).encode('utf-8')
+        with open(cache_path, 'wb') as f:
+            f.write(data)
     except Exception as e:
         logging.warning(f"Could not save checksum cache: {e}")
 
-def compute_md5(file_path):
-    """Compute MD5 checksum of a file."""
-    md5_hash = hashlib.md5()
+def make_cache_entry(st, digest):
+    """
+    Build a checksum cache entry. Size and mtime let later runs skip hashing
+    files that haven't been touched; algo keeps entries from other hashes
+    from matching.
+    """
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'algo': HASH_ALGO, 'hash': digest}
+
+def compute_digest(file_path):
+    """
+    Compute the HASH_ALGO checksum of a file.
+    BLAKE3 hashes a memory map of the file with SIMD. BLAKE2b uses
+    hashlib.file_digest (Python 3.11+), which loops in C; older interpreters
+    hash an mmap in one update() call, or 1 MiB reads if the file can't be
+    mapped.
+    """
+    if blake3 is not None:
+        return blake3.blake3().update_mmap(file_path).hexdigest()
+
     with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
-            md5_hash.update(chunk)
-    return md5_hash.hexdigest()
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'blake2b').hexdigest()
+
+        blake2_hash = hashlib.blake2b()
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                blake2_hash.update(mm)
+        except (ValueError, OSError):
+            # Empty files and special filesystems cannot be mapped
+            f.seek(0)
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                blake2_hash.update(chunk)
+        return blake2_hash.hexdigest()
 
 # -----------------------------------------------------------------------------
 # File Filtering Logic
 # -----------------------------------------------------------------------------
-def should_ignore_file(
-    file_path, 
-    config, 
-    checksum_cache, 
-    skip_if_unchanged=False
-):
-    """
-    Returns True if the file should be ignored based on:
-    - Exact filename match in ignore_files
-    - Ignored extensions
+def split_ignore_patterns(patterns):
+    """
+    Split ignore patterns into plain substrings and real regexes. A pattern
+    like '.*secret.*' or '.*\\.log' only asks "does the path contain this
+    text?" under re.search, which `in` answers without the regex engine.
+    Returns (tuple of literals, compiled regex of the rest or None).
+    """
+    literals = []
+    regexes = []
+    for pattern in patterns:
+        core = pattern
+        # Leading/trailing '.*' change nothing for search() on a one-line path
+        while core.startswith('.*'):
+            core = core[2:]
+        while core.endswith('.*') and not core.endswith('\\.*'):
+            core = core[:-2]
+        literal = re.sub(r'\\(.)', r'\1', core)
+        if re.escape(literal) == core:
+            literals.append(literal)
+        else:
+            regexes.append(pattern)
+    # An empty alternation would match everything, so keep None when unset
+    regex = re.compile('|'.join(f'(?:{p})' for p in regexes)) if regexes else None
+    return tuple(literals), regex
+
+# The filters below run for every entry of the walk, so each is built once per
+# run as a closure with its config values bound to locals, instead of looking
+# them up in the config dict on every call.
+def build_pattern_matcher(config):
+    """
+    Returns matches(path): True if path matches any of the ignore patterns
+    (substring literals first, then the fused regex).
+    """
+    literals = config['_ignore_literals']
+    regex_search = config['_ignore_re'].search if config['_ignore_re'] is not None else None
+
+    def matches(path):
+        for literal in literals:
+            if literal in path:
+                return True
+        return regex_search is not None and regex_search(path) is not None
+
+    return matches
+
+def build_name_filter(config):
+    """
+    Returns is_ignored_by_name(entry): the file checks that only look at the
+    path (ignore_files, ignored extensions, ignore patterns). No syscalls.
+    """
+    ignore_files = frozenset(config['ignore_files'])
+    ignore_exts = config['_ignore_exts']
+    matches_pattern = build_pattern_matcher(config)
+
+    def is_ignored_by_name(entry):
+        # Exact filename match in ignore_files
+        if entry.name in ignore_files:
+            return True
+        path = entry.path
+        # Ignored extension
+        if path.endswith(ignore_exts):
+            return True
+        # Ignore patterns (substring checks, then one fused regex)
+        return matches_pattern(path)
+
+    return is_ignored_by_name
+
+def build_file_filter(config, checksum_cache, skip_if_unchanged=False, new_entries=None, unchanged=None):
+    """
+    Returns should_ignore_file(entry), which takes an os.DirEntry from
+    walk_entries (so the name checks of build_name_filter have already been
+    applied) and returns True if the file should be ignored based on:
     - File size limit
     - Modified date
-    - Regex ignore patterns
-    - MD5 checksums (optional)
+    - Content checksums (optional): a file whose size and mtime match its
+      cache entry is unchanged without being read; otherwise it is hashed
+    Cache entries for hashed, kept files are stored in new_entries (if given)
+    so they don't have to be hashed a second time. Files skipped as unchanged
+    are recorded in unchanged (if given) with their previous cache entry, so
+    the writer can copy them from the previous output.
     """
-    # 0) Check if file name is in ignore_files
-    if os.path.basename(file_path) in config['ignore_files']:
-        return True
-    
-    # 1) Check extension
-    if any(file_path.endswith(ext) for ext in config['ignore_extensions']):
-        return True
-    
-    # 2) Check file size
-    if os.path.getsize(file_path) > config['max_file_size']:
-        return True
-    
-    # 3) Check modification date
-    file_mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-    if file_mod_time < datetime.strptime(config['modified_after'], '%Y-%m-%d'):
-        return True
-
-    # 4) Check regex ignore patterns
-    for pattern in config['ignore_patterns']:
-        if re.search(pattern, file_path):
+    max_file_size = config['max_file_size']
+    modified_after_ts = config['_modified_after_ts']
+
+    def should_ignore_file(entry):
+        file_path = entry.path
+
+        # 1) Check file size (the DirEntry caches its stat, so this is one syscall at most)
+        st = entry.stat()
+        if st.st_size > max_file_size:
             return True
 
-    # 5) If using checksums to skip unchanged files
-    if skip_if_unchanged:
-        new_md5 = compute_md5(file_path)
-        old_md5 = checksum_cache.get(file_path, None)
-        if old_md5 is not None and old_md5 == new_md5:
-            logging.debug(f"Skipping unchanged file: {file_path}")
+        # 2) Check modification date
+        if st.st_mtime < modified_after_ts:
             return True
 
-    return False
+        # 3) If using checksums to skip unchanged files
+        if skip_if_unchanged:
+            old_entry = checksum_cache.get(file_path, None)
+            # Entries from another algorithm (or the old bare-string format) never match
+            if not (isinstance(old_entry, dict) and old_entry.get('algo') == HASH_ALGO):
+                old_entry = None
+            # Same size and mtime as when it was hashed: unchanged, no read needed
+            if (old_entry is not None and old_entry.get('size') == st.st_size
+                    and old_entry.get('mtime_ns') == st.st_mtime_ns):
+                logging.debug(f"Skipping unchanged file: {file_path}")
+                if unchanged is not None:
+                    unchanged[file_path] = old_entry
+                return True
+            # Size or mtime moved: only the hash can tell if the content changed
+            new_entry = make_cache_entry(st, compute_digest(file_path))
+            if old_entry is not None and old_entry.get('hash') == new_entry['hash']:
+                checksum_cache[file_path] = new_entry
+                logging.debug(f"Skipping unchanged file (touched): {file_path}")
+                if unchanged is not None:
+                    unchanged[file_path] = old_entry
+                return True
+            if new_entries is not None:
+                new_entries[file_path] = new_entry
+
+        return False
+
+    return should_ignore_file
 
 # -----------------------------------------------------------------------------
 # File Reading
 # -----------------------------------------------------------------------------
-def process_file(file_path, config, checksum_cache):
+def process_file(file_path, config, checksum_cache, cache_entry=None):
     """
-    Returns a tuple (file_path, file_content) or raises an Exception on failure.
-    Also updates the checksum_cache if config['use_checksum_cache'] is True.
+    Prepares a file for output and returns its path, or raises an Exception
+    on failure. Updates the checksum_cache if config['use_checksum_cache'] is
+    True, reusing cache_entry when the file was already hashed during filtering.
+    The contents themselves are streamed by the writer (see stream_file_to).
     """
-    # Compute and update MD5 if configured
+    # Compute and update the checksum if configured
     if config['use_checksum_cache']:
-        file_md5 = compute_md5(file_path)
-        checksum_cache[file_path] = file_md5
+        if cache_entry is None:
+            cache_entry = make_cache_entry(os.stat(file_path), compute_digest(file_path))
+        checksum_cache[file_path] = cache_entry
+    elif HAS_FADVISE:
+        prefetch_file(file_path)
+    return file_path
+
+def process_batch(file_paths, config, checksum_cache, new_entries):
+    """
+    Runs process_file over a batch of files in one worker task. Returns a
+    list of (file_path, exception or None) pairs, in batch order, so one
+    failing file doesn't lose the rest of its batch.
+    """
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append((process_file(file_path, config, checksum_cache, new_entries.get(file_path)), None))
+        except Exception as e:
+            results.append((file_path, e))
+    return results
+
+def write_batch(output_file, results, use_sendfile=False, sections=None):
+    """
+    Streams each file of a finished process_batch into the output, logging
+    the ones that failed in the worker or while being copied. With sections
+    (the checksum cache), each file's place in the output is recorded.
+    """
+    for file_path, error in results:
+        if error is None:
+            offset = output_file.tell()
+            try:
+                stream_file_to(output_file, file_path, use_sendfile)
+            except Exception as e:
+                error = e
+            else:
+                if sections is not None:
+                    record_section(sections, file_path, offset, output_file.tell() - offset)
+        if error is not None:
+            logging.warning(f"Error reading {file_path}: {error}")
+
+def prefetch_file(file_path):
+    """
+    Asks the kernel to start reading the file into the page cache. The call
+    returns at once and the reads proceed asynchronously, many files at a
+    time, so the writer's copy finds the data already in memory. Purely a
+    hint: errors are ignored and surface when the file is streamed.
+    """
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-    return file_path, content
+def open_output(output_file_path, config):
+    """
+    Opens the output as a binary stream behind a 4 MiB write buffer. For
+    compressed output the buffer sits in front of a GzipFile at
+    config['compress_level'], so zlib gets large blocks rather than one
+    call per path line. The gzip header's timestamp is zeroed, so it doesn't
+    change the file from run to run. When isal is installed, levels 0-3
+    (ISA-L's whole range) compress with igzip instead of zlib.
+    """
+    if config['compress_output']:
+        level = config['compress_level']
+        gzip_file = igzip.GzipFile if igzip is not None and level <= 3 else gzip.GzipFile
+        gz = gzip_file(output_file_path, 'wb', compresslevel=level, mtime=0)
+        return io.BufferedWriter(gz, buffer_size=OUTPUT_BUFFER_SIZE)
+    return open(output_file_path, 'wb', buffering=OUTPUT_BUFFER_SIZE)
+
+def copy_range(output_file, src, offset, length, use_sendfile=False):
+    """
+    Copies length bytes of the open binary file src, starting at offset, into
+    the (binary) output file. With use_sendfile, the kernel copies page cache
+    to page cache via os.sendfile; otherwise (e.g. into gzip) the bytes move
+    through Python in COPY_BUFFER_SIZE chunks.
+    """
+    if use_sendfile:
+        # Anything still sitting in the writer's buffer must land first
+        output_file.flush()
+        sent_total = 0
+        try:
+            while sent_total < length:
+                sent = os.sendfile(output_file.fileno(), src.fileno(), offset + sent_total, length - sent_total)
+                if sent == 0:
+                    break
+                sent_total += sent
+            return
+        except OSError:
+            if sent_total:
+                raise
+            # Some platforms only sendfile() to sockets; copy in userspace instead
+    src.seek(offset)
+    remaining = length
+    while remaining > 0:
+        chunk = src.read(min(COPY_BUFFER_SIZE, remaining))
+        if not chunk:
+            break
+        output_file.write(chunk)
+        remaining -= len(chunk)
+
+def stream_file_to(output_file, file_path, use_sendfile=False):
+    """
+    Writes the file's path line followed by its bytes into the (binary)
+    output file, without building a Python string of the contents.
+    """
+    # Opened before the header is written, so an unreadable file leaves no trace
+    with open(file_path, 'rb') as src:
+        output_file.write((file_path + '\n').encode('utf-8'))
+        copy_range(output_file, src, 0, os.fstat(src.fileno()).st_size, use_sendfile)
+    output_file.write(b'\n')
+
+def copy_previous_section(output_file, previous_output, file_path, entry, use_sendfile=False):
+    """
+    Copies file_path's section (path line, contents, newline) from the
+    previous output into output_file, using the offset and length recorded
+    in its cache entry. Returns False, writing nothing, when there is no
+    previous output or the recorded section doesn't check out.
+    """
+    offset = entry.get('out_offset')
+    length = entry.get('out_len')
+    if previous_output is None or offset is None or length is None:
+        return False
+    header = (file_path + '\n').encode('utf-8')
+    # The section must be this file's path line, its size in bytes, then a newline
+    if length != len(header) + entry['size'] + 1:
+        return False
+    previous_output.seek(offset)
+    if previous_output.read(len(header)) != header:
+        return False
+    previous_output.seek(offset + length - 1)
+    if previous_output.read(1) != b'\n':
+        return False
+    copy_range(output_file, previous_output, offset, length, use_sendfile)
+    return True
+
+def record_section(checksum_cache, file_path, offset, length):
+    """Notes where a file's section landed in the output, for the next --incremental run."""
+    entry = checksum_cache.get(file_path)
+    if entry is not None:
+        checksum_cache[file_path] = {**entry, 'out_offset': offset, 'out_len': length}
+
+# -----------------------------------------------------------------------------
+# Directory Walking
+# -----------------------------------------------------------------------------
+def walk_entries(root, config, workers):
+    """
+    Yield os.DirEntry objects for the files under root whose name matches
+    file_extensions and isn't ignored by name (see build_name_filter),
+    pruning ignored directories (by name or regex pattern).
+
+    Directories are listed by `workers` threads sharing a queue, so slow
+    readdir/stat calls (network drives, cold caches) overlap instead of
+    running one after another. Each yielded entry has already been stat'ed
+    on a walker thread. Entries come out in no particular order.
+    """
+    dirs = queue.Queue()
+    found = queue.Queue()
+    pending = 1  # directories queued or being listed; the walk ends at 0
+    lock = threading.Lock()
+    ignore_dirs = frozenset(config['ignore_directories'])
+    file_exts = config['_file_exts']
+    matches_pattern = build_pattern_matcher(config)
+    is_ignored_by_name = build_name_filter(config)
+
+    def walker():
+        nonlocal pending
+        while True:
+            path = dirs.get()
+            if path is None:
+                return
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir():
+                            # Like os.walk, don't descend into symlinked directories
+                            if (entry.is_symlink()
+                                    or entry.name in ignore_dirs
+                                    or matches_pattern(entry.path)):
+                                continue
+                            with lock:
+                                pending += 1
+                            dirs.put(entry.path)
+                        elif entry.name.endswith(file_exts) and not is_ignored_by_name(entry):
+                            try:
+                                entry.stat()  # cached on the DirEntry for the filters
+                            except OSError:
+                                pass  # surfaces again when the filters stat it
+                            found.put(entry)
+            except OSError as e:
+                logging.warning(f"Could not scan directory {path}: {e}")
+            finally:
+                with lock:
+                    pending -= 1
+                    done = pending == 0
+                if done:
+                    found.put(None)
+                    for _ in range(workers):
+                        dirs.put(None)
+
+    threads = [threading.Thread(target=walker, daemon=True) for _ in range(workers)]
+    dirs.put(root)
+    for t in threads:
+        t.start()
+    while (entry := found.get()) is not None:
+        yield entry
+    for t in threads:
+        t.join()
 
 # -----------------------------------------------------------------------------
 # Main Work
@@ -262,64 +640,87 @@ def write_contents_to_file(config):
     else:
         checksum_cache = {}
 
-    # Decide on compression or plain text
+    # Decide on compression or plain output. Both are binary: file contents
+    # are copied through as bytes, never decoded.
     if config['compress_output']:
         output_file_path = config['output_filename'] + '.gz'
-        open_fn = gzip.open
-        mode = 'wt'  # text mode under gzip
+        use_sendfile = False  # bytes have to pass through the compressor
         logging.info(f"Output will be compressed into: {output_file_path}")
     else:
         output_file_path = config['output_filename']
-        open_fn = open
-        mode = 'w'
+        use_sendfile = hasattr(os, 'sendfile')
         logging.info(f"Output file: {output_file_path}")
 
     file_tasks = []
+    new_entries = {}  # cache entries hashed while filtering, reused by process_file
+    # Incremental runs keep unchanged files: path -> previous cache entry
+    unchanged = {} if config['incremental'] else None
+    sections = checksum_cache if config['incremental'] else None
+
+    should_ignore_file = build_file_filter(
+        config,
+        checksum_cache,
+        skip_if_unchanged=config['use_checksum_cache'],
+        new_entries=new_entries,
+        unchanged=unchanged
+    )
 
     logging.info("Collecting file list...")
-    for root, dirs, files in os.walk('.', topdown=True):
-        # Filter out ignored directories
-        dirs[:] = [
-            d for d in dirs
-            if d not in config['ignore_directories']
-            and not any(re.search(p, os.path.join(root, d)) for p in config['ignore_patterns'])
-        ]
-
-        for file in files:
-            if any(file.endswith(ext) for ext in config['file_extensions']):
-                file_path = os.path.join(root, file)
-                if should_ignore_file(
-                        file_path, 
-                        config, 
-                        checksum_cache, 
-                        skip_if_unchanged=config['use_checksum_cache']
-                ):
-                    continue
-
-                file_tasks.append(file_path)
+    for entry in walk_entries('.', config, config['threads']):
+        if should_ignore_file(entry):
+            continue
 
-    logging.info(f"Found {len(file_tasks)} files to process.")
+        file_tasks.append(entry.path)
 
-    # Threaded reading of files
-    results = []
-    with ThreadPoolExecutor(max_workers=config['threads']) as executor:
-        future_to_file = {
-            executor.submit(process_file, fp, config, checksum_cache): fp
-            for fp in file_tasks
-        }
-        for future in as_completed(future_to_file):
-            fp = future_to_file[future]
-            try:
-                results.append(future.result())
-            except Exception as e:
-                logging.warning(f"Error reading {fp}: {e}")
+    logging.info(f"Found {len(file_tasks)} files to process.")
 
-    # Write everything out
+    # An incremental run reads the previous output while writing the new one,
+    # so it writes next to it and renames over it at the end
+    write_path = output_file_path
+    previous_output = None
+    if config['incremental']:
+        write_path = output_file_path + '.tmp'
+        logging.info(f"Reusing {len(unchanged)} unchanged files from the previous output.")
+        try:
+            previous_output = open(output_file_path, 'rb')
+        except FileNotFoundError:
+            pass
+
+    # Worker threads prepare files (checksums) in batches while this thread streams
+    # each finished one straight into the output, so no contents pile up in memory
     logging.info("Writing to output...")
-    with open_fn(output_file_path, mode, encoding='utf-8') as output_file:
-        for file_path, file_contents in results:
-            output_file.write(file_path + '\n')
-            output_file.write(file_contents + '\n')
+    try:
+        with open_output(write_path, config) as output_file, \
+                ThreadPoolExecutor(max_workers=config['threads']) as executor:
+            # Unchanged files (incremental runs) come straight from the previous output
+            for fp, old_entry in (unchanged or {}).items():
+                offset = output_file.tell()
+                if not copy_previous_section(output_file, previous_output, fp, old_entry, use_sendfile):
+                    # Nothing usable recorded (e.g. the first incremental run); the source is unchanged anyway
+                    try:
+                        stream_file_to(output_file, fp, use_sendfile)
+                    except Exception as e:
+                        logging.warning(f"Error reading {fp}: {e}")
+                        continue
+                record_section(sections, fp, offset, output_file.tell() - offset)
+
+            max_inflight = MAX_INFLIGHT_PER_THREAD * config['threads']
+            pending = set()
+            for i in range(0, len(file_tasks), BATCH_SIZE):
+                # Only submit more once a slot frees up, writing what finished meanwhile
+                if len(pending) >= max_inflight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write_batch(output_file, future.result(), use_sendfile, sections)
+                pending.add(executor.submit(process_batch, file_tasks[i:i + BATCH_SIZE],
+                                            config, checksum_cache, new_entries))
+            for future in as_completed(pending):
+                write_batch(output_file, future.result(), use_sendfile, sections)
+    finally:
+        if previous_output is not None:
+            previous_output.close()
+    if write_path != output_file_path:
+        os.replace(write_path, output_file_path)
 
     # Save the updated checksums if using
     if config['use_checksum_cache']:
@@ -338,9 +739,21 @@ def main():
     config = DEFAULT_CONFIG.copy()
     config['output_filename'] = args.output_filename
     config['compress_output'] = args.compress_output
+    config['compress_level'] = args.compress_level
     config['modified_after'] = args.modified_after
     config['threads'] = args.threads
     config['use_checksum_cache'] = args.use_checksum_cache
+    config['incremental'] = args.incremental
+    if config['incremental']:
+        if config['compress_output']:
+            # Sections can't be located (or copied) inside a gzip stream
+            logging.warning("--incremental is ignored with --compress")
+            config['incremental'] = False
+        else:
+            config['use_checksum_cache'] = True
+
+    # Parse the date filter once rather than once per file
+    config['_modified_after_ts'] = datetime.strptime(config['modified_after'], '%Y-%m-%d').timestamp()
 
     # If user specified extra ignore patterns, merge them
     if args.ignore_patterns:
@@ -350,6 +763,14 @@ def main():
     if args.ignore_files:
         config['ignore_files'].extend(args.ignore_files)
 
+    # Patterns that are plain substrings become `in` checks; the rest are fused
+    # into one regex so each path is searched once
+    config['_ignore_literals'], config['_ignore_re'] = split_ignore_patterns(config['ignore_patterns'])
+
+    # str.endswith accepts a tuple and checks every suffix in one call
+    config['_ignore_exts'] = tuple(config['ignore_extensions'])
+    config['_file_exts'] = tuple(config['file_extensions'])
+
     write_contents_to_file(config)
 
 if __name__ == '__main__':
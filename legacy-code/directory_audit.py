@@ -6,55 +6,83 @@ import re
 import time
 import math
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import ast
+import functools
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from tree_sitter_languages import get_parser
+except ImportError:  # optional: fall back to REGEX_PATTERNS
+    get_parser = None
 
 # -------------------
 # Configurable Globals
 # -------------------
 IGNORE_DIRS = {".git", "node_modules", "dist", "build", "__pycache__"}
 MAX_FILE_SIZE_MB = 5  # Skip files larger than this many MB
-NUM_WORKERS = 8       # Thread pool size (adjust as needed)
+NUM_WORKERS = os.cpu_count()  # Process pool size: regex scanning is CPU-bound, so one per core
+PROGRESS_INTERVAL_NS = 100_000_000  # Redraw the progress line at most 10 times a second
+REPORT_BUFFER_SIZE = 1 << 20  # 1 MiB write buffer per report file
 
 # A naive check to see if file might be binary:
 # We'll look at a chunk and see if there's a high ratio of non-text bytes.
 BINARY_THRESHOLD = 0.3  # If > 30% non-printable in the sample, consider it binary.
+TEXT_BYTES = bytes(range(32, 127)) + b'\n\r\t\b'  # Bytes that count as "printable"
+
+# Maps both line-break characters to spaces in one str.translate pass
+NEWLINE_TRANS = str.maketrans({'\n': ' ', '\r': ' '})
 
 # Regex patterns to extract method/function definitions from various languages
-# This is *very naive* and can be expanded or refined:
+# This is *very naive* and can be expanded or refined.
+# One pattern per language, so each file is scanned once; every alternative
+# captures the name in a named group (read back through match.lastgroup).
+JS_PATTERN = re.compile(
+    # function myFunc(...) or const myFunc = (...) => { } or let myFunc = () => {}
+    # (lookaheads, so a definition later on the same line is still found)
+    r"\bfunction\s+(?P<fn>[a-zA-Z_][a-zA-Z0-9_]*)(?=\s*\(.*\))"
+    r"|\b(?:const|let)\s+(?P<arrow>[a-zA-Z_][a-zA-Z0-9_]*)(?=\s*=\s*\(.*?\)\s*=>)",
+    re.MULTILINE,
+)
 REGEX_PATTERNS = {
-    "py": [
-        # Python function definition: def function_name(...):
-        re.compile(r"^\s*def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)\s*:", re.MULTILINE),
-    ],
-    "js": [
-        # function myFunc(...) or const myFunc = (...) => { } or let myFunc = () => {}
-        re.compile(r"\bfunction\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)", re.MULTILINE),
-        re.compile(r"\b(?:const|let)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*\(.*?\)\s*=>", re.MULTILINE),
-    ],
-    "ts": [
-        # Similar to JS patterns
-        re.compile(r"\bfunction\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)", re.MULTILINE),
-        re.compile(r"\b(?:const|let)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*\(.*?\)\s*=>", re.MULTILINE),
-    ],
-    "cpp": [
-        # Very naive C++ function signature detection (returnType funcName(...))
-        re.compile(r"\b[a-zA-Z_][a-zA-Z0-9_:<>]*\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)", re.MULTILINE),
-    ],
-    "c": [
-        # Similarly naive for C
-        re.compile(r"\b[a-zA-Z_][a-zA-Z0-9_*]*\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)", re.MULTILINE),
-    ],
-    "h": [
-        # Headers often contain function declarations
-        re.compile(r"\b[a-zA-Z_][a-zA-Z0-9_:<>]*\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)", re.MULTILINE),
-    ],
-    "lua": [
-        # Lua function pattern: function name(...)
-        re.compile(r"\bfunction\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)", re.MULTILINE),
-    ],
+    # Python function definition: def function_name(...):
+    "py": re.compile(r"^\s*def\s+(?P<fn>[a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)\s*:", re.MULTILINE),
+    "js": JS_PATTERN,
+    # Similar to JS patterns
+    "ts": JS_PATTERN,
+    # Very naive C++ function signature detection (returnType funcName(...))
+    "cpp": re.compile(r"\b[a-zA-Z_][a-zA-Z0-9_:<>]*\s+(?P<fn>[a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)", re.MULTILINE),
+    # Similarly naive for C
+    "c": re.compile(r"\b[a-zA-Z_][a-zA-Z0-9_*]*\s+(?P<fn>[a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)", re.MULTILINE),
+    # Headers often contain function declarations
+    "h": re.compile(r"\b[a-zA-Z_][a-zA-Z0-9_:<>]*\s+(?P<fn>[a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)", re.MULTILINE),
+    # Lua function pattern: function name(...)
+    "lua": re.compile(r"\bfunction\s+(?P<fn>[a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)", re.MULTILINE),
     # Add more patterns for other languages if necessary, e.g. CSS doesn't usually have "functions" in the same sense.
 }
 
+# When tree_sitter_languages is installed, these extensions are parsed into a
+# real syntax tree instead (no regex backtracking, no matches inside strings/comments)
+TREE_SITTER_LANGUAGES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "c": "c",
+    "cpp": "cpp",
+    "h": "cpp",
+    "lua": "lua",
+}
+# Nodes whose "name" field is the function's name
+TREE_SITTER_NAMED_DEFINITIONS = {
+    "function_declaration",
+    "generator_function_declaration",
+    "method_definition",
+    "function_definition_statement",
+    "local_function_definition_statement",
+}
+# C/C++ nodes that may declare a function through their declarator chain
+TREE_SITTER_C_DEFINITIONS = {"function_definition", "declaration", "field_declaration"}
+
 def is_ignored_directory(path):
     """
     Check if 'path' ends with one of our ignored directories.
@@ -62,11 +90,33 @@ def is_ignored_directory(path):
     dir_name = os.path.basename(os.path.normpath(path))
     return dir_name in IGNORE_DIRS
 
-def is_file_too_large(file_path):
+def walk_entries(directory):
+    """
+    Recursively yield os.DirEntry objects for the files under directory,
+    skipping ignored directories. The entries carry the stat info gathered
+    while listing the directory, so callers don't need to stat again.
+    """
+    try:
+        it = os.scandir(directory)
+    except OSError:
+        return  # unreadable directory: skipped, as os.walk does
+    with it:
+        for entry in it:
+            if entry.is_dir():
+                # Like os.walk, don't descend into symlinked directories
+                if not entry.is_symlink() and not is_ignored_directory(entry.path):
+                    yield from walk_entries(entry.path)
+            else:
+                yield entry
+
+def is_file_too_large(file_path, file_size=None):
     """
     Check if file size is larger than MAX_FILE_SIZE_MB.
+    Pass file_size when it is already known to avoid another stat.
     """
-    file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+    if file_size is None:
+        file_size = os.path.getsize(file_path)
+    file_size_mb = file_size / (1024 * 1024)
     return file_size_mb > MAX_FILE_SIZE_MB
 
 def looks_like_binary(file_path, chunk_size=1024):
@@ -80,34 +130,118 @@ def looks_like_binary(file_path, chunk_size=1024):
             chunk = f.read(chunk_size)
         if not chunk:  # empty file
             return False
-        # Count how many bytes are "non-printable"
-        text_chars = bytearray(range(32,127)) + b'\n\r\t\b'
-        non_text_count = sum(byte not in text_chars for byte in chunk)
+        # A NUL byte almost never shows up in text, so that settles most binaries
+        if b'\x00' in chunk:
+            return True
+        # Count how many bytes are "non-printable": delete the text bytes in one C pass
+        non_text_count = len(chunk.translate(None, TEXT_BYTES))
         ratio = non_text_count / len(chunk)
         return ratio > BINARY_THRESHOLD
     except:
         return True  # If any error, treat as binary
 
-def extract_methods_from_content(content, extension):
+def extract_python_methods(content):
     """
-    Use naive regex patterns to extract function/method-like definitions.
-    Returns a list of strings (method names).
+    Extract function/method names from Python source with the ast module,
+    in source order. Raises SyntaxError/ValueError if it doesn't parse.
+    """
+    nodes = [
+        node for node in ast.walk(ast.parse(content))
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    ]
+    nodes.sort(key=lambda node: (node.lineno, node.col_offset))
+    return [node.name for node in nodes]
+
+@functools.lru_cache(maxsize=None)
+def get_tree_sitter_parser(language):
+    # One parser per grammar per worker process
+    return get_parser(language)
+
+def c_declarator_name(node):
+    """
+    Return the name of the function a C/C++ definition or declaration
+    declares, or None if it doesn't declare a function.
     """
+    declarator = node.child_by_field_name("declarator")
+    while declarator is not None and declarator.type != "function_declarator":
+        declarator = declarator.child_by_field_name("declarator")
+    if declarator is None:
+        return None
+    name = declarator.child_by_field_name("declarator")
+    # Foo::bar and bar<T> -> bar, like the regex's last identifier
+    while name is not None and name.type in ("qualified_identifier", "template_function"):
+        name = name.child_by_field_name("name")
+    if name is None or name.type not in ("identifier", "field_identifier", "destructor_name", "operator_name"):
+        return None
+    return name.text.decode("utf-8", "ignore")
+
+def extract_tree_sitter_methods(content, language):
+    """
+    Extract function/method names by walking a tree-sitter syntax tree,
+    in source order.
+    """
+    tree = get_tree_sitter_parser(language).parse(content.encode("utf-8"))
     methods = []
-    # Lowercase extension for matching
-    ext = extension.lower()
-    if ext in REGEX_PATTERNS:
-        patterns = REGEX_PATTERNS[ext]
-        for pattern in patterns:
-            matches = pattern.findall(content)
-            methods.extend(matches)
+    stack = [tree.root_node]
+    while stack:
+        node = stack.pop()
+        kind = node.type
+        name = None
+        if kind in TREE_SITTER_C_DEFINITIONS:
+            name = c_declarator_name(node)
+        elif kind in TREE_SITTER_NAMED_DEFINITIONS:
+            name_node = node.child_by_field_name("name")
+            if name_node is not None:
+                name = name_node.text.decode("utf-8", "ignore")
+        elif kind == "variable_declarator":
+            # const myFunc = (...) => { }
+            value = node.child_by_field_name("value")
+            name_node = node.child_by_field_name("name")
+            if value is not None and value.type == "arrow_function" and name_node is not None:
+                name = name_node.text.decode("utf-8", "ignore")
+        if name:
+            methods.append(name)
+        # Reversed so children pop off the stack in source order
+        stack.extend(reversed(node.children))
     return methods
 
-def process_file(file_path):
+def extract_methods_from_content(content, ext):
+    """
+    Extract function/method-like definitions. Python goes through ast;
+    other languages use tree-sitter when installed. Anything else (or
+    Python that doesn't parse) falls back to the naive regex patterns.
+    `ext` must already be lowercase.
+    Returns a list of strings (method names).
+    """
+    if ext == "py":
+        try:
+            return extract_python_methods(content)
+        except (SyntaxError, ValueError, RecursionError):
+            pass  # e.g. Python 2 sources; the regex still finds the defs
+    elif get_parser is not None and ext in TREE_SITTER_LANGUAGES:
+        return extract_tree_sitter_methods(content, TREE_SITTER_LANGUAGES[ext])
+
+    pattern = REGEX_PATTERNS.get(ext)
+    if pattern is None:
+        return []
+    return [m.group(m.lastgroup) for m in pattern.finditer(content)]
+
+def write_lines(f, lines):
+    """
+    Append lines to a report that already has its first line written,
+    producing the same text as "\\n".join over the whole report would.
+    Each line goes straight into the file's buffer, so a file's full
+    content (report 4) is never copied into a joined string first.
+    """
+    for line in lines:
+        f.write("\n")
+        f.write(line)
+
+def process_file(file_path, file_size=None):
     """
     Processes a single file:
     - Reads the content (if it's small, non-binary)
-    - Extracts line_count, char_count, single_line_content
+    - Extracts line_count, char_count
     - Identifies extension
     - Extracts method names
     Returns a dict with file info.
@@ -126,21 +260,25 @@ def process_file(file_path):
         "file_name": filename,
         "line_count": 0,
         "char_count": 0,
-        "content": "",  # full content if we need it
-        "single_line_content": "",
+        "content": "",  # full content; report 2 flattens it when writing
         "methods": []
     }
 
     # If the file is too large or looks binary, skip reading
-    if is_file_too_large(file_path):
+    if is_file_too_large(file_path, file_size):
         return file_info  # No info beyond extension/file_path
     if looks_like_binary(file_path):
         return file_info  # skip
 
-    # Attempt to read (ignore encoding errors)
+    # Attempt to read (ignore encoding errors). One unbuffered binary read and
+    # a single decode of the whole buffer, rather than a text-mode decoder
+    # working through 8 KiB pieces
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        with open(file_path, 'rb', buffering=0) as f:
+            content = f.read().decode('utf-8', errors='ignore')
+        # Same line endings text mode's universal newlines would have given
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
     except Exception as e:
         # If there's an error reading the file, just return partial info
         print(f"[WARN] Could not read file {file_path}: {e}")
@@ -150,16 +288,12 @@ def process_file(file_path):
     line_count = len(lines)
     char_count = len(content)
 
-    # Single-line content (for GPT usage, etc.)
-    single_line_content = content.replace('\n', ' ').replace('\r', ' ')
-
     # Extract method names based on extension
-    methods_found = extract_methods_from_content(content, extension)
+    methods_found = extract_methods_from_content(content, extension.lower())
 
     file_info["line_count"] = line_count
     file_info["char_count"] = char_count
     file_info["content"] = content  # We keep the full content for the "human-readable" report
-    file_info["single_line_content"] = single_line_content
     file_info["methods"] = methods_found
 
     return file_info
@@ -181,140 +315,125 @@ def main():
     output_dir = "output"
     os.makedirs(output_dir, exist_ok=True)
 
-    # Let's collect all file paths first so we can show progress
+    # Let's collect all file paths first so we can show progress.
+    # Sizes come from the scandir entries, so workers don't stat each file again.
     file_paths = []
-    for root, dirs, files in os.walk(directory):
-        # Skip ignored directories
-        dirs[:] = [d for d in dirs if not is_ignored_directory(os.path.join(root, d))]
-
-        for filename in files:
-            file_path = os.path.join(root, filename)
-            file_paths.append(file_path)
+    file_sizes = {}
+    for entry in walk_entries(directory):
+        file_paths.append(entry.path)
+        try:
+            file_sizes[entry.path] = entry.stat().st_size
+        except OSError:
+            pass  # e.g. a dangling symlink; process_file reports it
 
     total_files = len(file_paths)
     print(f"[INFO] Found {total_files} files to process.\n")
 
-    # We'll store all file info here
-    file_info_list = []
+    # Reports are written as each file finishes, so no file's content is held
+    # after its sections are out. Report 1 lists every extension before the
+    # per-file summary, so its summary part is spooled to a temp file meanwhile.
     extensions_set = set()
 
-    # Progress stats
-    start_time = time.time()
-    processed_count = 0
-
-    # Use a ThreadPoolExecutor for concurrency
-    with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
-        future_to_path = {executor.submit(process_file, fp): fp for fp in file_paths}
-
-        for future in as_completed(future_to_path):
-            processed_count += 1
-            file_path = future_to_path[future]
-            try:
-                info = future.result()
-                file_info_list.append(info)
-                extensions_set.add(info["extension"])
-            except Exception as e:
-                print(f"[ERROR] Exception processing {file_path}: {e}")
-
-            # Progress logging
-            elapsed = time.time() - start_time
-            avg_time_per_file = elapsed / processed_count
-            remaining = total_files - processed_count
-            eta_seconds = remaining * avg_time_per_file
-            eta_str = time.strftime("%H:%M:%S", time.gmtime(eta_seconds))
-
-            progress_percent = (processed_count / total_files) * 100
-            print(f"[PROGRESS] {processed_count}/{total_files} ({progress_percent:.2f}%) ETA: {eta_str}", end='\r')
-
-    print()  # new line after progress
-
-    # ------------------------
-    # Generate existing Reports
-    # ------------------------
-
-    # 1) Report on file extensions, plus summary (lines, chars)
-    report1_lines = []
-    report1_lines.append("=== REPORT 1 ===\n")
-    report1_lines.append("File Extensions Found:")
-    report1_lines.append("----------------------")
-    for ext in sorted(extensions_set):
-        if ext == '':
-            report1_lines.append("  (no extension)")
-        else:
-            report1_lines.append(f"  .{ext}")
-    report1_lines.append("")
-
-    report1_lines.append("File Summary:")
-    report1_lines.append("-------------")
-    for info in file_info_list:
-        ext_str = f".{info['extension']}" if info['extension'] else "(no extension)"
-        report1_lines.append(f"File Name: {info['file_name']}")
-        report1_lines.append(f"  Path: {info['file_path']}")
-        report1_lines.append(f"  Extension: {ext_str}")
-        report1_lines.append(f"  Lines: {info['line_count']}")
-        report1_lines.append(f"  Characters: {info['char_count']}")
-        report1_lines.append("")
-
-    # 2) Report with files & single-line content (suitable for GPT or other processing)
-    report2_lines = []
-    report2_lines.append("=== REPORT 2 ===\n")
-    report2_lines.append("Files With Their Entire Content on One Line:")
-    report2_lines.append("--------------------------------------------")
-    for info in file_info_list:
-        # e.g. "/path/to/my_file.py: import os print('helloworld')"
-        single_line = info['single_line_content']
-        # If you prefer, you could limit length or do other formatting
-        report2_lines.append(f"{info['file_path']}: {single_line}")
-
-    # ------------------------
-    # New Reports: Method Extraction
-    # ------------------------
-
-    # 3) Human-Readable: methods/functions found, with minimal formatting
-    report3_lines = []
-    report3_lines.append("=== REPORT 3 (Human-Readable Methods/Functions) ===\n")
-    for info in file_info_list:
-        if not info["methods"]:
-            continue
-        report3_lines.append(f"File: {info['file_path']}")
-        report3_lines.append(f"Methods/Functions Found ({len(info['methods'])}):")
-        for m in info["methods"]:
-            report3_lines.append(f"  - {m}")
-        report3_lines.append("")
-
-    # 4) GPT-Focused Report: path + full (original) content (or some truncated version)
-    #    If you'd prefer single-line content, just reuse `single_line_content`.
-    #    This is basically a raw dump but can be changed as you like.
-    report4_lines = []
-    report4_lines.append("=== REPORT 4 (GPT-Focused Code Dump) ===\n")
-    for info in file_info_list:
-        # We'll keep the original multi-line content but you can switch to single-line if needed
-        file_header = f"FILE: {info['file_path']}"
-        separator = "-" * len(file_header)
-        report4_lines.append(file_header)
-        report4_lines.append(separator)
-        report4_lines.append(info['content'])
-        report4_lines.append("\n")  # extra spacing
-
-    # ------------------------
-    # Write out the reports
-    # ------------------------
     report1_path = os.path.join(output_dir, "report1.txt")
     report2_path = os.path.join(output_dir, "report2.txt")
     report3_path = os.path.join(output_dir, "report3.txt")
     report4_path = os.path.join(output_dir, "report4.txt")
 
-    with open(report1_path, 'w', encoding='utf-8') as f1:
-        f1.write("\n".join(report1_lines))
-
-    with open(report2_path, 'w', encoding='utf-8') as f2:
-        f2.write("\n".join(report2_lines))
-
-    with open(report3_path, 'w', encoding='utf-8') as f3:
-        f3.write("\n".join(report3_lines))
+    # Progress stats
+    start_ns = time.monotonic_ns()
+    last_print_ns = 0
+    processed_count = 0
 
-    with open(report4_path, 'w', encoding='utf-8') as f4:
-        f4.write("\n".join(report4_lines))
+    with tempfile.TemporaryFile('w+', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as summary_file, \
+            open(report2_path, 'w', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as f2, \
+            open(report3_path, 'w', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as f3, \
+            open(report4_path, 'w', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as f4:
+
+        # 1) Report on file extensions, plus summary (lines, chars)
+        write_lines(summary_file, ["File Summary:", "-------------"])
+
+        # 2) Report with files & single-line content (suitable for GPT or other processing)
+        f2.write("=== REPORT 2 ===\n")
+        write_lines(f2, ["Files With Their Entire Content on One Line:",
+                         "--------------------------------------------"])
+
+        # ------------------------
+        # New Reports: Method Extraction
+        # ------------------------
+
+        # 3) Human-Readable: methods/functions found, with minimal formatting
+        f3.write("=== REPORT 3 (Human-Readable Methods/Functions) ===\n")
+
+        # 4) GPT-Focused Report: path + full (original) content (or some truncated version)
+        #    If you'd prefer single-line content, use `content.translate(NEWLINE_TRANS)`.
+        #    This is basically a raw dump but can be changed as you like.
+        f4.write("=== REPORT 4 (GPT-Focused Code Dump) ===\n")
+
+        # Use a ProcessPoolExecutor so the regex work runs on every core instead of
+        # queueing on the GIL. REGEX_PATTERNS is compiled at import, once per worker.
+        with ProcessPoolExecutor(max_workers=NUM_WORKERS) as executor:
+            future_to_path = {executor.submit(process_file, fp, file_sizes.get(fp)): fp for fp in file_paths}
+
+            for future in as_completed(future_to_path):
+                processed_count += 1
+                file_path = future_to_path[future]
+                try:
+                    info = future.result()
+                    extensions_set.add(info["extension"])
+
+                    ext_str = f".{info['extension']}" if info['extension'] else "(no extension)"
+                    write_lines(summary_file, [
+                        f"File Name: {info['file_name']}",
+                        f"  Path: {info['file_path']}",
+                        f"  Extension: {ext_str}",
+                        f"  Lines: {info['line_count']}",
+                        f"  Characters: {info['char_count']}",
+                        "",
+                    ])
+
+                    # e.g. "/path/to/my_file.py: import os print('helloworld')"
+                    # If you prefer, you could limit length or do other formatting
+                    # Flattened here rather than in the worker, so only one copy of
+                    # the text is sent back and held per file
+                    write_lines(f2, [f"{info['file_path']}: {info['content'].translate(NEWLINE_TRANS)}"])
+
+                    if info["methods"]:
+                        write_lines(f3, [f"File: {info['file_path']}",
+                                         f"Methods/Functions Found ({len(info['methods'])}):"])
+                        write_lines(f3, [f"  - {m}" for m in info["methods"]])
+                        write_lines(f3, [""])
+
+                    # We'll keep the original multi-line content but you can switch to single-line if needed
+                    file_header = f"FILE: {info['file_path']}"
+                    separator = "-" * len(file_header)
+                    write_lines(f4, [file_header, separator, info['content'], "\n"])  # extra spacing
+                except Exception as e:
+                    print(f"[ERROR] Exception processing {file_path}: {e}")
+
+                # Progress logging, throttled (the last file always gets a line)
+                now_ns = time.monotonic_ns()
+                if now_ns - last_print_ns < PROGRESS_INTERVAL_NS and processed_count < total_files:
+                    continue
+                last_print_ns = now_ns
+                remaining = total_files - processed_count
+                eta_seconds = int((now_ns - start_ns) * remaining / processed_count / 1e9)
+                minutes, seconds = divmod(eta_seconds, 60)
+                hours, minutes = divmod(minutes, 60)
+
+                progress_percent = (processed_count / total_files) * 100
+                print(f"[PROGRESS] {processed_count}/{total_files} ({progress_percent:.2f}%) "
+                      f"ETA: {hours:02d}:{minutes:02d}:{seconds:02d}", end='\r')
+
+        print()  # new line after progress
+
+        # Report 1 needs the full extension list up front, then the spooled summary
+        with open(report1_path, 'w', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as f1:
+            f1.write("=== REPORT 1 ===\n")
+            write_lines(f1, ["File Extensions Found:", "----------------------"])
+            write_lines(f1, ["  (no extension)" if ext == '' else f"  .{ext}" for ext in sorted(extensions_set)])
+            write_lines(f1, [""])
+            summary_file.seek(0)
+            shutil.copyfileobj(summary_file, f1, REPORT_BUFFER_SIZE)
 
     print("\n[INFO] Audit completed.")
     print("Reports generated:")
@@ -1,5 +1,4 @@
-import os
-from datetime import datetime
+from source_files import iter_source_files
 
 config = {
     'file_extensions': ['.js', '.jsx', '.ts', '.tsx', '.json'],
@@ -12,40 +11,27 @@ config = {
     'recursive': True
 }
 
-def should_ignore_file(file_path):
-    if any(file_path.endswith(ext) for ext in config['ignore_extensions']):
-        return True
-    if os.path.basename(file_path) in config['ignore_files']:
-        return True
-    if os.path.getsize(file_path) > config['max_file_size']:
-        return True
-    file_mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-    if file_mod_time < datetime.strptime(config['modified_after'], '%Y-%m-%d'):
-        return True
-    return False
+LINE_COUNT = 100
+HEAD_READ_SIZE = 256 * 1024  # Most bytes read per file, so one-line minified files stay cheap
 
 def write_first_100_lines():
     with open(config['output_filename'], 'w', encoding='utf-8') as output_file:
-        for root, dirs, files in os.walk('.', topdown=True):
-            dirs[:] = [d for d in dirs if d not in config['ignore_directories']]
-            for file in files:
-                if any(file.endswith(ext) for ext in config['file_extensions']):
-                    file_path = os.path.join(root, file)
-                    if should_ignore_file(file_path):
-                        continue
-                    try:
-                        # Write the file path
-                        output_file.write(f'{file_path}\n')
-                        # Write the first 100 lines of the file
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as input_file:
-                            for i, line in enumerate(input_file):
-                                if i >= 100:
-                                    break
-                                output_file.write(line)
-                        # Add a newline for clarity between files
-                        output_file.write('\n')
-                    except Exception as e:
-                        print(f"Error reading {file_path}: {e}")
+        for file_path, _ in iter_source_files(config):
+            try:
+                # Write the file path
+                output_file.write(f'{file_path}\n')
+                # Write the first 100 lines of the file, from a bounded read
+                with open(file_path, 'rb') as input_file:
+                    head = input_file.read(HEAD_READ_SIZE)
+                # Cut just after the 100th newline, if the read got that far
+                parts = head.split(b'\n', LINE_COUNT)
+                if len(parts) > LINE_COUNT:
+                    head = head[:len(head) - len(parts[-1])]
+                output_file.write(head.decode('utf-8', errors='ignore'))
+                # Add a newline for clarity between files
+                output_file.write('\n')
+            except Exception as e:
+                print(f"Error reading {file_path}: {e}")
 
 if __name__ == '__main__':
     write_first_100_lines()
\ No newline at end of file
@@ -19,7 +19,7 @@ JSON config can contain:
 import argparse
 import logging
 
-from config import DEFAULT_CONFIG, load_config_file, merge_configs
+from config import DEFAULT_CONFIG, load_config_file, merge_configs, normalize_config
 from aggregator import collect_and_write_context
 
 def parse_command_line_args():
@@ -87,6 +87,7 @@ def main():
     # if args.project_name:
     #     final_config['project_name'] = args.project_name
 
+    normalize_config(final_config)
     collect_and_write_context(final_config)
 
 if __name__ == '__main__':